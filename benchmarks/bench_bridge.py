@@ -0,0 +1,249 @@
+"""Bridge micro-benchmarks against the fake backend, and the regression gate baseline.
+
+Needs no display: calls are made by the fake backend's simulated page, so this
+measures the Python side of the bridge only.  Machine speed is factored out
+with a fixed pure Python calibration loop, so that ``baseline.json`` recorded
+on one machine can gate runs on another.
+
+Usage:
+    python benchmarks/bench_bridge.py                     # print results
+    python benchmarks/bench_bridge.py --update-baseline   # re-record baseline.json
+
+The gate itself runs with ``WEBVIEW_PERF_GATE=1 python -m pytest tests/test_perf_gate.py``.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from unittest import mock
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, "..", "src")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+sys.path.insert(0, SRC_DIR)
+
+from webview import webview as _webview_module  # noqa: E402
+from webview._fake_backend import _FakeWebviewLibrary  # noqa: E402
+from webview.webview import Webview  # noqa: E402
+
+REPEAT = 5
+
+
+@contextmanager
+def fake_backend():
+    lib = _FakeWebviewLibrary(latency=0)
+    with mock.patch.object(_webview_module, "_webview_lib", lib):
+        yield lib
+
+
+def best(fn, repeat=REPEAT):
+    """Smallest of ``repeat`` timings returned by ``fn``."""
+    return min(fn() for _ in range(repeat))
+
+
+def calibration_ms() -> float:
+    """Time of a fixed pure Python workload, the unit machine speed is measured in."""
+    def once():
+        start = time.perf_counter()
+        total = 0
+        for i in range(300_000):
+            total += i * i % 7
+        return (time.perf_counter() - start) * 1000
+    return best(once, 5)
+
+
+def drive(webview: Webview, futures: list) -> float:
+    """Run the window until every future is resolved; returns the seconds it took."""
+    remaining = len(futures)
+    lock = threading.Lock()
+
+    def done(_):
+        nonlocal remaining
+        with lock:
+            remaining -= 1
+            if remaining == 0:
+                webview.dispatch(webview.terminate)
+
+    start = time.perf_counter()
+    for future in futures:
+        future.add_done_callback(done)
+    webview.run()
+    elapsed = time.perf_counter() - start
+    for future in futures:
+        future.result(0)
+    return elapsed
+
+
+def bind_calls_per_s(calls: int = 20_000) -> float:
+    def once():
+        with fake_backend() as lib:
+            webview = Webview()
+            webview.bind("add", lambda a, b: a + b)
+            page = lib.page(webview._handle)
+            return drive(webview, [page.call("add", i, 1) for i in range(calls)])
+    return calls / best(once)
+
+
+def bind_100kb_mb_per_s(calls: int = 300) -> float:
+    payload = "x" * (100 * 1024)
+
+    def once():
+        with fake_backend() as lib:
+            webview = Webview()
+            webview.bind("echo", lambda data: data)
+            page = lib.page(webview._handle)
+            return drive(webview, [page.call("echo", payload) for _ in range(calls)])
+    # Payload crosses the bridge both ways.
+    return calls * len(payload) * 2 / best(once) / 1e6
+
+
+def batch_calls_per_s(batches: int = 200, size: int = 100) -> float:
+    def once():
+        with fake_backend() as lib:
+            webview = Webview()
+            webview.bind("add", lambda a, b: a + b)
+            webview.enable_batching()
+            page = lib.page(webview._handle)
+            futures = []
+            for _ in range(batches):
+                futures.extend(page.call_batch([("add", [i, 1]) for i in range(size)]))
+            return drive(webview, futures)
+    return batches * size / best(once)
+
+
+def eval_us(evals: int = 100_000) -> float:
+    def once():
+        with fake_backend():
+            webview = Webview()
+            start = time.perf_counter()
+            for i in range(evals):
+                webview.eval("window.counter = (window.counter || 0) + 1")
+            elapsed = time.perf_counter() - start
+            webview.destroy()
+            return elapsed
+    return best(once) / evals * 1e6
+
+
+def import_ms() -> float:
+    code = "import time; t = time.perf_counter(); import webview; print(time.perf_counter() - t)"
+    env = dict(os.environ, WEBVIEW_BACKEND="fake",
+               PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.environ.get("PYTHONPATH")])))
+
+    def once():
+        out = subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True)
+        return float(out.stdout.strip().splitlines()[-1]) * 1000
+    return best(once, 5)
+
+
+def binding_memory_kb(bindings: int = 500) -> float:
+    with fake_backend():
+        webview = Webview()
+        webview.bind("warmup", lambda: None)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            for i in range(bindings):
+                webview.bind(f"fn{i}", lambda x, i=i: x + i)
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        webview.destroy()
+    return (after - before) / bindings / 1024
+
+
+# name -> (function, better, scales with machine speed)
+METRICS = {
+    "bind_calls_per_s": (bind_calls_per_s, "higher", True),
+    "bind_100kb_mb_per_s": (bind_100kb_mb_per_s, "higher", True),
+    "batch_calls_per_s": (batch_calls_per_s, "higher", True),
+    "eval_us": (eval_us, "lower", True),
+    "import_ms": (import_ms, "lower", True),
+    "binding_memory_kb": (binding_memory_kb, "lower", False),
+}
+
+# Default allowed regression, as a fraction of the baseline value.
+TOLERANCES = {
+    "bind_calls_per_s": 0.35,
+    "bind_100kb_mb_per_s": 0.35,
+    "batch_calls_per_s": 0.35,
+    "eval_us": 1.0,
+    "import_ms": 1.0,
+    "binding_memory_kb": 0.25,
+}
+
+
+def run_all() -> dict:
+    results = {"calibration_ms": calibration_ms(), "metrics": {}}
+    for name, (fn, _, _) in METRICS.items():
+        results["metrics"][name] = fn()
+    return results
+
+
+def normalize(name: str, value: float, calibration: float, baseline_calibration: float) -> float:
+    """``value`` as if measured on the machine the baseline was recorded on."""
+    _, better, scales = METRICS[name]
+    if not scales:
+        return value
+    speed = calibration / baseline_calibration
+    return value * speed if better == "higher" else value / speed
+
+
+def compare(results: dict, baseline: dict) -> list:
+    """Return ``(name, normalized value, baseline value, limit, ok)`` for every baseline metric."""
+    rows = []
+    for name, spec in baseline["metrics"].items():
+        value = normalize(name, results["metrics"][name], results["calibration_ms"], baseline["calibration_ms"])
+        if spec["better"] == "higher":
+            limit = spec["value"] * (1 - spec["tolerance"])
+            ok = value >= limit
+        else:
+            limit = spec["value"] * (1 + spec["tolerance"])
+            ok = value <= limit
+        rows.append((name, value, spec["value"], limit, ok))
+    return rows
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_baseline(results: dict, path: str = BASELINE_PATH):
+    # Keep tolerances that were tuned by hand in the committed file.
+    tolerances = dict(TOLERANCES)
+    if os.path.exists(path):
+        tolerances.update({name: spec["tolerance"] for name, spec in load_baseline(path)["metrics"].items()})
+    baseline = {
+        "calibration_ms": round(results["calibration_ms"], 3),
+        "python": sys.version.split()[0],
+        "metrics": {
+            name: {"value": round(value, 3), "better": METRICS[name][1], "tolerance": tolerances[name]}
+            for name, value in results["metrics"].items()
+        },
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--update-baseline", action="store_true", help=f"write the results to {BASELINE_PATH}")
+    args = parser.parse_args()
+    results = run_all()
+    if args.update_baseline:
+        write_baseline(results)
+    if os.path.exists(BASELINE_PATH):
+        for name, value, base, limit, ok in compare(results, load_baseline()):
+            print(f"{name:>22} {value:12.3f}  baseline {base:12.3f}  limit {limit:12.3f}  {'ok' if ok else 'REGRESSION'}")
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
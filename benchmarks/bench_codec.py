@@ -0,0 +1,74 @@
+"""Round-trip cost of the bind/return codecs.
+
+Measures what the bridge does for every JS -> Python call: decode the request
+bytes handed over by the native callback, then encode the result back into the
+bytes passed to ``webview_return``.  The ``legacy`` row reproduces the previous
+``req.decode()`` + ``json.loads`` / ``json.dumps`` + ``str.encode`` path.
+
+Usage:
+    python benchmarks/bench_codec.py
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from webview.codec import JsonCodec, OrjsonCodec, MsgspecCodec  # noqa: E402
+
+SIZES = {"1KB": 1024, "100KB": 100 * 1024, "10MB": 10 * 1024 * 1024}
+
+
+class _LegacyCodec:
+    name = "legacy"
+
+    def loads(self, data):
+        return json.loads(data.decode())
+
+    def dumps(self, obj):
+        return json.dumps(obj).encode("utf-8")
+
+
+def make_payload(size: int) -> bytes:
+    """Build a JSON request (an argument list) of roughly ``size`` bytes."""
+    row = {"id": 0, "name": "row-000000", "value": 0.5, "tags": ["alpha", "beta"], "active": True}
+    row_size = len(json.dumps(row))
+    rows = [dict(row, id=i, name=f"row-{i:06d}", value=i * 0.5) for i in range(max(1, size // row_size))]
+    return json.dumps([rows]).encode("utf-8")
+
+
+def available_codecs():
+    codecs = [_LegacyCodec(), JsonCodec()]
+    for factory in (OrjsonCodec, MsgspecCodec):
+        try:
+            codecs.append(factory())
+        except ImportError:
+            pass
+    return codecs
+
+
+def round_trip(codec, request: bytes, min_time: float = 0.5) -> float:
+    """Return the mean seconds per decode + encode round trip."""
+    loops = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time or loops < 3:
+        args = codec.loads(request)
+        codec.dumps(args[0])
+        loops += 1
+        elapsed = time.perf_counter() - start
+    return elapsed / loops
+
+
+def main():
+    codecs = available_codecs()
+    print(f"{'payload':>8} " + " ".join(f"{c.name:>12}" for c in codecs))
+    for label, size in SIZES.items():
+        request = make_payload(size)
+        timings = [round_trip(codec, request) for codec in codecs]
+        print(f"{label:>8} " + " ".join(f"{t * 1e6:10.1f}us" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Benchmarks for the bridge, eval, navigation and startup paths.
+
+Covers:
+    import      time to ``import webview`` in a fresh interpreter
+    load        time to load the native library with ``webview.preload()``
+    construct   ``Webview()`` construction (and destruction) time
+    bind        JS -> Python round-trip latency and throughput per payload size
+    eval        ``Webview.eval`` throughput, until the page has run every script
+    navigate    time to load large documents as ``data:`` URLs and with ``set_html``
+    codec       bind/return codec round trips (see bench_codec.py)
+
+On Linux without a display the suite re-runs itself under ``xvfb-run``.
+Results are written as JSON so that runs can be compared over time.
+
+Usage:
+    python benchmarks/run.py [--only bind,eval] [--output results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+BIND_SIZES = {"16B": 16, "1KB": 1024, "100KB": 100 * 1024, "1MB": 1024 * 1024}
+NAVIGATE_SIZES = {"100KB": 100 * 1024, "1MB": 1024 * 1024, "5MB": 5 * 1024 * 1024}
+EVAL_COUNT = 2000
+PAGE_TIMEOUT = 120
+
+
+def summarize(samples_ms):
+    """Latency summary of a list of milliseconds."""
+    ordered = sorted(samples_ms)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q / 100.0 * len(ordered)))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "p50_ms": pick(50),
+        "p95_ms": pick(95),
+        "p99_ms": pick(99),
+        "min_ms": ordered[0],
+        "max_ms": ordered[-1],
+    }
+
+
+def run_window(setup, timeout=PAGE_TIMEOUT):
+    """Create a window, let ``setup(webview, finish)`` drive it, return what it finishes with.
+
+    ``finish(result)`` must be called on the UI thread (e.g. from a binding).
+    """
+    from webview import Webview
+
+    webview = Webview()
+    outcome = {}
+
+    def finish(result):
+        outcome["result"] = result
+        webview.terminate()
+
+    def give_up():
+        outcome.setdefault("error", f"timed out after {timeout}s")
+        webview.dispatch(webview.terminate)
+
+    timer = threading.Timer(timeout, give_up)
+    timer.daemon = True
+    timer.start()
+    try:
+        setup(webview, finish)
+        webview.run()
+    finally:
+        timer.cancel()
+    if "error" in outcome and "result" not in outcome:
+        raise RuntimeError(outcome["error"])
+    return outcome["result"]
+
+
+def time_fresh(statement, setup="", repeat=5):
+    """Milliseconds ``statement`` takes in a fresh interpreter, after ``setup``."""
+    code = f"{setup}\nimport time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.environ.get("PYTHONPATH")])))
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True)
+        samples.append(float(out.stdout.strip().splitlines()[-1]) * 1000)
+    return summarize(samples)
+
+
+def bench_import(repeat=5):
+    """Milliseconds to import webview in a fresh interpreter; the library itself loads on first use."""
+    return time_fresh("import webview", repeat=repeat)
+
+
+def bench_load(repeat=5):
+    """Milliseconds to load the native library with ``preload()`` in a fresh interpreter.
+
+    A first, untimed run downloads the library if it is not there yet.
+    """
+    time_fresh("webview.preload()", setup="import webview", repeat=1)
+    return time_fresh("webview.preload()", setup="import webview", repeat=repeat)
+
+
+def bench_construct(repeat=10):
+    from webview import Webview
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        webview = Webview()
+        created = time.perf_counter()
+        webview.destroy()
+        samples.append((created - start) * 1000)
+    return summarize(samples)
+
+
+BIND_PAGE = """<!doctype html>
+<html><body><script>
+const SIZES = %(sizes)s;
+async function measure(label, size) {
+  const payload = "x".repeat(size);
+  const rounds = Math.max(20, Math.min(1000, Math.floor(50 * 1024 * 1024 / Math.max(size, 1) / 10)));
+  for (let i = 0; i < 5; i++) await echo(payload);
+  const latencies = [];
+  const start = performance.now();
+  for (let i = 0; i < rounds; i++) {
+    const t = performance.now();
+    await echo(payload);
+    latencies.push(performance.now() - t);
+  }
+  const sequential = performance.now() - start;
+  const burstStart = performance.now();
+  await Promise.all(Array.from({length: rounds}, () => echo(payload)));
+  const burst = performance.now() - burstStart;
+  return {size: size, rounds: rounds, latencies: latencies, sequential_ms: sequential, burst_ms: burst};
+}
+window.addEventListener("load", async () => {
+  const results = {};
+  for (const [label, size] of Object.entries(SIZES)) results[label] = await measure(label, size);
+  benchDone(results);
+});
+</script></body></html>"""
+
+
+def bench_bind():
+    def setup(webview, finish):
+        webview.bind("echo", lambda payload: payload)
+        webview.bind("benchDone", finish)
+        webview.navigate("data:text/html," + quote(BIND_PAGE % {"sizes": json.dumps(BIND_SIZES)}))
+
+    raw = run_window(setup)
+    results = {}
+    for label, entry in raw.items():
+        rounds = entry["rounds"]
+        results[label] = {
+            "bytes": entry["size"],
+            "latency": summarize(entry["latencies"]),
+            "sequential_calls_per_s": rounds / (entry["sequential_ms"] / 1000),
+            "burst_calls_per_s": rounds / (entry["burst_ms"] / 1000),
+            "burst_mb_per_s": rounds * entry["size"] * 2 / (entry["burst_ms"] / 1000) / 1e6,
+        }
+    return results
+
+
+def bench_eval(count=EVAL_COUNT):
+    timings = {}
+
+    def setup(webview, finish):
+        def start():
+            timings["start"] = time.perf_counter()
+            for i in range(count):
+                webview.eval(f"window.__evals = (window.__evals || 0) + 1")
+            timings["issued"] = time.perf_counter()
+            webview.eval("evalDone(window.__evals)")
+            return None
+
+        def eval_done(evaluated):
+            timings["done"] = time.perf_counter()
+            finish(evaluated)
+
+        webview.bind("evalStart", start)
+        webview.bind("evalDone", eval_done)
+        html = "<!doctype html><script>window.addEventListener('load', () => evalStart())</script>"
+        webview.navigate("data:text/html," + quote(html))
+
+    evaluated = run_window(setup)
+    total = timings["done"] - timings["start"]
+    return {
+        "count": count,
+        "evaluated": evaluated,
+        "issue_ms": (timings["issued"] - timings["start"]) * 1000,
+        "total_ms": total * 1000,
+        "evals_per_s": count / total,
+    }
+
+
+def bench_navigate():
+    """Load time of large documents, as a percent-encoded data: URL and through set_html()."""
+    results = {}
+
+    def setup(webview, finish):
+        pending = [(label, size, method) for label, size in NAVIGATE_SIZES.items()
+                   for method in ("data_url", "set_html")]
+        current = {}
+
+        def load_next():
+            label, size, method = pending.pop(0)
+            body = "<p>" + "webview " * (size // 8) + "</p>"
+            html = f"<!doctype html><html><body>{body}<script>loaded()</script></body></html>"
+            current.update(label=label, size=size, method=method, start=time.perf_counter())
+            if method == "data_url":
+                webview.navigate("data:text/html," + quote(html))
+            else:
+                webview.set_html(html)
+
+        def loaded():
+            elapsed = time.perf_counter() - current["start"]
+            entry = results.setdefault(current["label"], {"html_bytes": current["size"]})
+            entry[current["method"] + "_ms"] = elapsed * 1000
+            if pending:
+                webview.dispatch(load_next)
+            else:
+                webview.dispatch(lambda: finish(results))
+
+        webview.bind("loaded", loaded)
+        load_next()
+
+    return run_window(setup)
+
+
+def bench_codec():
+    sys.path.insert(0, BENCH_DIR)
+    import bench_codec
+
+    results = {}
+    for label, size in bench_codec.SIZES.items():
+        request = bench_codec.make_payload(size)
+        results[label] = {codec.name: bench_codec.round_trip(codec, request) * 1000
+                          for codec in bench_codec.available_codecs()}
+    return results
+
+
+BENCHMARKS = {
+    "import": bench_import,
+    "load": bench_load,
+    "construct": bench_construct,
+    "bind": bench_bind,
+    "eval": bench_eval,
+    "navigate": bench_navigate,
+    "codec": bench_codec,
+}
+
+
+def ensure_display(argv):
+    """Re-run under xvfb-run on Linux when there is no display to open windows on."""
+    if platform.system() != "Linux" or os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"):
+        return
+    if os.environ.get("WEBVIEW_BENCH_XVFB"):
+        raise SystemExit("No display available even under xvfb-run")
+    xvfb_run = shutil.which("xvfb-run")
+    if not xvfb_run:
+        raise SystemExit("No display available; install xvfb (xvfb-run) to run the benchmarks headless")
+    env = dict(os.environ, WEBVIEW_BENCH_XVFB="1")
+    os.execvpe(xvfb_run, [xvfb_run, "--auto-servernum", sys.executable] + argv, env)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", help="comma separated benchmarks to run: " + ",".join(BENCHMARKS))
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    if any(name not in ("import", "load", "codec") for name in names):
+        ensure_display([os.path.abspath(__file__)] + (sys.argv[1:] if argv is None else argv))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "webview_version": os.getenv("WEBVIEW_VERSION", "0.9.0"),
+        },
+        "results": {},
+    }
+    for name in names:
+        print(f"running {name}...", file=sys.stderr)
+        report["results"][name] = BENCHMARKS[name]()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
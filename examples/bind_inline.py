@@ -1,5 +1,4 @@
 import os
-from urllib.parse import quote
 
 from webview import Webview, SizeHint, Size
 
@@ -70,7 +69,7 @@ html_path = os.path.join(current_dir, 'local_use_bind.html')
 
 
 # Load the inline HTML
-webview.navigate(f"data:text/html,{quote(html)}")
+webview.set_html(html)
 
 # Run the webview
 webview.run()
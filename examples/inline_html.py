@@ -1,5 +1,4 @@
 from webview import Webview
-from urllib.parse import quote
 
 html = """
 <html>
@@ -10,5 +9,5 @@ html = """
 """
 
 webview = Webview()
-webview.navigate(f"data:text/html,{quote(html)}")
+webview.set_html(html)
 webview.run()
@@ -51,6 +51,6 @@ if missing_libs:
     print(f"请运行 {os.path.join(current_dir, script_name)} 下载所需库文件")
     sys.exit(1)
 
-# 使用file://协议加载HTML
-webview.navigate(f"file://{html_path}")
+# 通过本地回环HTTP服务器加载HTML（支持ES模块和HTTP缓存）
+webview.serve_directory(current_dir, index=os.path.basename(html_path))
 webview.run() 
@@ -1,5 +1,4 @@
 from webview.webview import Webview, Size, SizeHint
-from urllib.parse import quote
 import json
 
 # 创建Webview实例
@@ -172,5 +171,5 @@ html = """
 </html>
 """
 
-webview.navigate(f"data:text/html,{quote(html)}")
+webview.set_html(html)
 webview.run()
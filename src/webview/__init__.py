@@ -1 +1,2 @@
 from .webview import Webview, Size, SizeHint
+from ._webview_ffi import preload
@@ -0,0 +1,125 @@
+"""Drive an asyncio event loop from inside the native webview loop.
+
+This is the ``poll_events``/``process_events``/``process_ready`` split
+prototyped in ``examples/async_with_asyncio_guest_run``, without patching
+asyncio: a backend thread blocks in the loop's selector until there is I/O or
+a timer is due, then hands the events to the UI thread through
+``Webview.dispatch``, where the callbacks run.  The two threads take turns, so
+loop internals are never touched concurrently, and an idle loop costs no CPU.
+"""
+import asyncio
+import heapq
+import threading
+from asyncio.base_events import MAXIMUM_SELECT_TIMEOUT
+from functools import partial
+
+
+class _AsyncioGuest:
+    def __init__(self, dispatch):
+        # Polling needs the loop's selector; on Windows new_event_loop()
+        # would return a ProactorEventLoop, which has none.
+        self.loop = asyncio.SelectorEventLoop()
+        self._dispatch = dispatch
+        self._turn = threading.Semaphore(0)
+        self._stopping = False
+        self._thread = None
+        # Loop time the poll thread sleeps until; None while it is computing it.
+        self._deadline = None
+
+    def start(self):
+        """Make the loop the running loop of the calling (UI) thread."""
+        asyncio.set_event_loop(self.loop)
+        asyncio._set_running_loop(self.loop)
+        self._thread = threading.Thread(target=self._poll_forever, name="webview-asyncio", daemon=True)
+        self._thread.start()
+        # Run whatever was scheduled before start, then hand over to polling.
+        self._dispatch(partial(self._process, []))
+
+    def wake(self):
+        """Interrupt a blocking poll after callbacks were added from outside the loop."""
+        if not self._stopping:
+            self.loop._write_to_self()
+
+    def wake_if_needed(self):
+        """Wake the poll if callbacks or an earlier timer were added since it started waiting.
+
+        Called on the UI thread after code that may have touched the loop
+        without going through it, such as dispatched closures.
+        """
+        loop = self.loop
+        if loop._ready:
+            self.wake()
+            return
+        deadline = self._deadline
+        if loop._scheduled and (deadline is None or loop._scheduled[0]._when < deadline):
+            self.wake()
+
+    def stop(self):
+        """Stop polling and release the loop from the calling thread."""
+        self._stopping = True
+        self.loop._write_to_self()
+        self._turn.release()
+        if self._thread is not None:
+            self._thread.join()
+        asyncio._set_running_loop(None)
+
+    def close(self):
+        loop = self.loop
+        try:
+            tasks = [task for task in asyncio.all_tasks(loop) if not task.done()]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    def _timeout(self):
+        loop = self.loop
+        if loop._ready or loop._stopping:
+            return 0
+        try:
+            when = loop._scheduled[0]._when
+        except IndexError:
+            return None
+        return min(max(0, when - loop.time()), MAXIMUM_SELECT_TIMEOUT)
+
+    def _poll_forever(self):
+        while True:
+            self._turn.acquire()
+            if self._stopping:
+                return
+            self._deadline = None
+            timeout = self._timeout()
+            self._deadline = float("inf") if timeout is None else self.loop.time() + timeout
+            events = self.loop._selector.select(timeout)
+            if self._stopping:
+                return
+            self._dispatch(partial(self._process, events))
+
+    def _process(self, events):
+        # Runs on the UI thread; mirrors BaseEventLoop._run_once() after the poll.
+        loop = self.loop
+        try:
+            if events:
+                loop._process_events(events)
+            while loop._scheduled and loop._scheduled[0]._cancelled:
+                loop._timer_cancelled_count -= 1
+                handle = heapq.heappop(loop._scheduled)
+                handle._scheduled = False
+            end_time = loop.time() + loop._clock_resolution
+            while loop._scheduled:
+                handle = loop._scheduled[0]
+                if handle._when >= end_time:
+                    break
+                handle = heapq.heappop(loop._scheduled)
+                handle._scheduled = False
+                loop._ready.append(handle)
+            for _ in range(len(loop._ready)):
+                handle = loop._ready.popleft()
+                if not handle._cancelled:
+                    handle._run()
+        finally:
+            self._turn.release()
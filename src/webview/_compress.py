@@ -0,0 +1,215 @@
+"""Precompressed gzip/brotli variants of served assets, cached on disk.
+
+Each asset is compressed once, at maximum level, on a background thread the
+first time it is requested; until then it is sent as is.  Variants are
+stored in the cache directory under the content hash of the asset
+(``<sha256[:16]>.br``/``.gz``), so they survive restarts and are shared by
+every file with the same content.  An empty file records that compression
+did not pay off.  Files of a megabyte or more are memory-mapped for hashing
+and compressing instead of being read into memory.  Stopping the cache
+drops assets still waiting to be compressed rather than waiting for them.
+
+Brotli needs the ``brotli`` (or ``brotlicffi``) package; without it only
+gzip variants are made.
+"""
+import gzip
+import hashlib
+import logging
+import mmap
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from typing import Optional, Tuple
+
+_MMAP_THRESHOLD = 1 << 20
+# Smaller files gain less than the headers cost.
+_MIN_SIZE = 1024
+# Variants that do not save at least 5% are not worth decoding.
+_MIN_RATIO = 0.95
+# Temporary files this old were left by a process that exited mid-write.
+_STALE_TEMP_AGE = 3600
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "application/manifest+json",
+                 "application/wasm", "application/xml", "image/svg+xml", "image/x-icon", "font/ttf", "font/otf")
+
+
+def _brotli_compress():
+    for name in ("brotli", "brotlicffi"):
+        try:
+            module = __import__(name)
+        except ImportError:
+            continue
+        return lambda data: module.compress(data, quality=11)
+    return None
+
+
+def _default_directory() -> str:
+    directory = os.getenv("WEBVIEW_ASSET_CACHE")
+    if directory:
+        return directory
+    if sys.platform == "win32":
+        base = os.getenv("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "webview_python", "assets")
+
+
+def compressible(content_type: str, size: int) -> bool:
+    return size >= _MIN_SIZE and content_type.startswith(_COMPRESSIBLE)
+
+
+def accepted_encodings(header: Optional[str]) -> set:
+    """Codings an ``Accept-Encoding`` header allows, ignoring ``q=0``."""
+    accepted = set()
+    for item in (header or "").split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding)
+    return accepted
+
+
+class _VariantCache:
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or _default_directory()
+        os.makedirs(self.directory, exist_ok=True)
+        # Preferred first.
+        self._codecs = {}
+        brotli = _brotli_compress()
+        if brotli is not None:
+            self._codecs["br"] = ("br", brotli)
+        self._codecs["gzip"] = ("gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))
+        self._variants = {}
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._jobs = queue.SimpleQueue()
+        self._remove_stale_temporaries()
+        self._thread = threading.Thread(target=self._work, name="webview-compress", daemon=True)
+        self._thread.start()
+
+    @property
+    def encodings(self) -> list:
+        return list(self._codecs)
+
+    def find(self, key, source, accepted: set) -> Optional[Tuple[str, str, int]]:
+        """Best cached variant as ``(encoding, path, size)``, or None to send the asset as is.
+
+        Args:
+            key: Identifies this version of the asset, e.g. path, mtime and size.
+            source: Path of the file, or its contents, to compress on a miss.
+            accepted: Codings the client accepts.
+        """
+        variants = self._variants.get(key)
+        if variants is None:
+            with self._lock:
+                if key not in self._queued and not self._stopped:
+                    self._queued.add(key)
+                    self._jobs.put((key, source))
+            return None
+        for encoding, variant in variants.items():
+            if encoding in accepted:
+                return (encoding,) + variant
+        return None
+
+    def wait(self):
+        """Block until every scheduled asset has been compressed."""
+        done = threading.Event()
+        with self._lock:
+            if self._stopped:
+                return
+            self._jobs.put((None, done))
+        done.wait()
+
+    def stop(self):
+        """Drop the assets still queued and let the worker exit without waiting for it.
+
+        An asset being compressed is abandoned after its current encoding.
+        """
+        with self._lock:
+            self._stopped = True
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job[0] is None:
+                    job[1].set()
+            self._jobs.put(None)
+
+    def _remove_stale_temporaries(self):
+        cutoff = time.time() - _STALE_TEMP_AGE
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.name.startswith(".") and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                except OSError:
+                    pass
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            key, source = job
+            if key is None:
+                source.set()
+                continue
+            if self._stopped:
+                return
+            try:
+                variants = self._prepare(source)
+            except Exception:
+                logging.exception("webview: compressing %s failed", key)
+                variants = {}
+            self._variants[key] = variants
+            with self._lock:
+                self._queued.discard(key)
+
+    def _prepare(self, source) -> dict:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return self._compress_all(source)
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_size >= _MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return self._compress_all(data)
+            return self._compress_all(f.read())
+
+    def _compress_all(self, data) -> dict:
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        variants = {}
+        for encoding, (ext, compress) in self._codecs.items():
+            path = os.path.join(self.directory, f"{digest}.{ext}")
+            try:
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                blob = compress(data)
+                if len(blob) > len(data) * _MIN_RATIO:
+                    blob = b""
+                if self._stopped:
+                    break
+                # Written under a temporary name, so readers never see a partial file.
+                fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f".{digest}.")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(blob)
+                    os.replace(tmp, path)
+                except BaseException:
+                    os.unlink(tmp)
+                    raise
+                size = len(blob)
+            if size:
+                variants[encoding] = (path, size)
+        return variants
@@ -0,0 +1,60 @@
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable
+
+
+class _OffloadTracker:
+    """Counts the sync binding calls handed to executors.
+
+    ``queued`` calls wait for a worker, ``running`` calls occupy one, and
+    ``workers`` is the combined size of the pools used so far (when known).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools = {}
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+
+    def submit(self, executor: Executor, fn: Callable[..., Any], *args) -> Future:
+        def run():
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+
+        with self._lock:
+            self._pools[id(executor)] = getattr(executor, "_max_workers", None)
+            self.queued += 1
+        try:
+            future = executor.submit(run)
+        except BaseException:
+            with self._lock:
+                self.queued -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future):
+        # A call cancelled before it started never reaches run().
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            sizes = [size for size in self._pools.values() if size]
+            workers = sum(sizes) if sizes else None
+            return {
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "workers": workers,
+                "utilization": self.running / workers if workers else None,
+            }
@@ -0,0 +1,228 @@
+"""In-process stand-in for the native libwebview library.
+
+Selected with ``WEBVIEW_BACKEND=fake``.  It exposes the same ``webview_*``
+functions as ``_WebviewLibrary`` but opens no window and needs no display:
+each handle gets a ``_FakePage`` with its own event loop, which runs on the
+thread calling ``webview_run`` just like the native one.  The page plays the
+JavaScript side of the bridge: ``call()`` invokes a binding the way the page
+would and returns a ``concurrent.futures.Future`` resolved by the reply, so the
+Python side can be load tested and profiled in isolation.
+
+Calls and replies are delayed by ``latency`` seconds each way, taken from
+``WEBVIEW_FAKE_LATENCY_MS`` (default 0).
+"""
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future
+from ctypes import CFUNCTYPE
+from typing import Any, Dict, List, Optional, Tuple
+
+from .codec import _default, _revive
+from ._replies import _RESOLVE_PREFIX, _RESOLVE_SUFFIX
+
+_BATCH_BINDING = "__webview_batch_call__"
+
+
+class _CallRejected(Exception):
+    """A binding call rejected by Python; ``value`` is what the page would get."""
+
+    def __init__(self, value: Any):
+        super().__init__(value)
+        self.value = value
+
+
+class _FakePage:
+    """One fake window: its event loop, bindings and the page-side state."""
+
+    def __init__(self, handle: int, latency: float):
+        self.handle = handle
+        self.latency = latency
+        self.title = None
+        self.size = None
+        self.url = None
+        self.html = None
+        self.scripts = []
+        self.evals = deque(maxlen=1000)
+        self.eval_count = 0
+        self.bindings = {}
+        self._pending = {}
+        self._seq = itertools.count(1)
+        self._order = itertools.count()
+        self._ready = deque()
+        self._timers = []
+        self._terminated = False
+        self._cond = threading.Condition()
+
+    def post(self, fn, delay: float = 0.0):
+        """Run ``fn`` on the loop thread, after ``delay`` seconds."""
+        with self._cond:
+            if delay > 0:
+                heapq.heappush(self._timers, (time.monotonic() + delay, next(self._order), fn))
+            else:
+                self._ready.append(fn)
+            self._cond.notify()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._terminated:
+                        self._terminated = False
+                        return
+                    now = time.monotonic()
+                    while self._timers and self._timers[0][0] <= now:
+                        self._ready.append(heapq.heappop(self._timers)[2])
+                    if self._ready:
+                        fn = self._ready.popleft()
+                        break
+                    self._cond.wait(self._timers[0][0] - now if self._timers else None)
+            try:
+                fn()
+            except Exception:
+                logging.exception("webview: fake backend callback failed")
+
+    def terminate(self):
+        with self._cond:
+            self._terminated = True
+            self._cond.notify()
+
+    def call(self, name: str, *args) -> Future:
+        """Call binding ``name`` from the page; the future resolves with its result.
+
+        A rejected call raises ``_CallRejected`` from ``future.result()``.
+        """
+        future = Future()
+        req = json.dumps(list(args), separators=(",", ":"), default=_default).encode("utf-8")
+        self.post(lambda: self._deliver(name, req, future), self.latency)
+        return future
+
+    def call_batch(self, calls: List[Tuple[str, list]]) -> List[Future]:
+        """Send ``(name, args)`` calls as one batch, like the page does after ``enable_batching()``."""
+        futures = [Future() for _ in calls]
+
+        def unpack(batch: Future):
+            error = batch.exception()
+            for future, reply in zip(futures, [] if error else batch.result()):
+                if reply[0] == 0:
+                    future.set_result(reply[1])
+                else:
+                    future.set_exception(_CallRejected(reply[1]))
+            if error:
+                for future in futures:
+                    future.set_exception(error)
+
+        self.call(_BATCH_BINDING, [[name, list(args)] for name, args in calls]).add_done_callback(unpack)
+        return futures
+
+    def _deliver(self, name: str, req: bytes, future: Future):
+        binding = self.bindings.get(name)
+        if binding is None:
+            future.set_exception(_CallRejected(f"{name} is not bound"))
+            return
+        ref, arg = binding
+        fn = ref()
+        if fn is None:
+            # The native library would call into freed memory here.
+            logging.error("webview: fake backend called %s after its callback was freed", name)
+            future.set_exception(_CallRejected(f"{name} callback was freed"))
+            return
+        seq = str(next(self._seq)).encode("ascii")
+        self._pending[seq] = future
+        fn(seq, req, arg)
+
+    def reply(self, seq: bytes, status: int, result: Optional[bytes]):
+        future = self._pending.pop(seq, None)
+        if future is None:
+            return
+        value = _revive(json.loads(result)) if result else None
+        if status == 0:
+            outcome = lambda: future.set_result(value)
+        else:
+            outcome = lambda: future.set_exception(_CallRejected(value))
+        if self.latency > 0:
+            self.post(outcome, self.latency)
+        else:
+            outcome()
+
+    def eval(self, source: bytes):
+        self.eval_count += 1
+        self.evals.append(source)
+        # Coalesced replies arrive as one script resolving many promises.
+        if source.startswith(_RESOLVE_PREFIX) and source.endswith(_RESOLVE_SUFFIX):
+            entries = json.loads(b"[" + source[len(_RESOLVE_PREFIX):-len(_RESOLVE_SUFFIX)] + b"]")
+            for seq, status, result in entries:
+                self.reply(seq.encode("utf-8"), status, result.encode("utf-8"))
+
+
+class _FakeWebviewLibrary:
+    """Drop-in replacement for ``_WebviewLibrary`` without native code."""
+
+    def __init__(self, latency: Optional[float] = None):
+        if latency is None:
+            latency = float(os.getenv("WEBVIEW_FAKE_LATENCY_MS", "0")) / 1000
+        self.latency = latency
+        self.pages: Dict[int, _FakePage] = {}
+        self._handles = itertools.count(1)
+        self.CFUNCTYPE = CFUNCTYPE
+
+    def page(self, handle: int) -> _FakePage:
+        return self.pages[handle]
+
+    def webview_create(self, debug: int, window) -> int:
+        handle = next(self._handles)
+        self.pages[handle] = _FakePage(handle, self.latency)
+        return handle
+
+    def webview_destroy(self, handle: int):
+        page = self.pages.pop(handle, None)
+        if page is not None:
+            page.terminate()
+
+    def webview_run(self, handle: int):
+        self.pages[handle].run()
+
+    def webview_terminate(self, handle: int):
+        page = self.pages.get(handle)
+        if page is not None:
+            page.terminate()
+
+    def webview_set_title(self, handle: int, title: bytes):
+        self.pages[handle].title = title.decode("utf-8")
+
+    def webview_set_size(self, handle: int, width: int, height: int, hint: int):
+        self.pages[handle].size = (width, height, hint)
+
+    def webview_navigate(self, handle: int, url: bytes):
+        self.pages[handle].url = url.decode("utf-8")
+
+    def webview_set_html(self, handle: int, html: bytes):
+        page = self.pages[handle]
+        page.url = "about:blank"
+        page.html = html.decode("utf-8")
+
+    def webview_init(self, handle: int, source: bytes):
+        self.pages[handle].scripts.append(source)
+
+    def webview_eval(self, handle: int, source: bytes):
+        self.pages[handle].eval(source)
+
+    def webview_bind(self, handle: int, name: bytes, fn, arg):
+        # Like the native library, hold only the function pointer: keeping
+        # the callback alive is up to the caller.
+        self.pages[handle].bindings[name.decode("utf-8")] = (weakref.ref(fn), arg)
+
+    def webview_unbind(self, handle: int, name: bytes):
+        self.pages[handle].bindings.pop(name.decode("utf-8"), None)
+
+    def webview_return(self, handle: int, seq: bytes, status: int, result: bytes):
+        self.pages[handle].reply(seq, status, result)
+
+    def webview_dispatch(self, handle: int, fn, arg):
+        self.pages[handle].post(lambda: fn(handle, arg))
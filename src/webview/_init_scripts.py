@@ -0,0 +1,127 @@
+"""Named, ordered and deduplicated init scripts.
+
+``webview_init`` can only append: every call adds one more script that runs
+on every page load, and none can be taken back.  Scripts are therefore
+collected here and handed to the native library as one concatenated script
+per flush, in priority order (lower first, then in the order they were
+added), skipping any whose content was already injected under another
+name.  ``Webview`` flushes before navigating and before running the window,
+and right away while it runs.
+"""
+import functools
+import hashlib
+import itertools
+import threading
+from typing import Callable, Optional, Union
+
+
+class _InitScript:
+    __slots__ = ("name", "source", "priority", "digest", "order", "injected")
+
+    def __init__(self, name: Optional[str], source: str, priority: int, order: int):
+        self.name = name
+        self.source = source
+        self.priority = priority
+        self.digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        self.order = order
+        self.injected = False
+
+
+@functools.lru_cache(maxsize=256)
+def _minify(minifier: Callable[[str], str], source: str) -> str:
+    return minifier(source)
+
+
+def _resolve_minifier(minify: Union[bool, Callable[[str], str]]) -> Optional[Callable[[str], str]]:
+    if minify is True:
+        import rjsmin
+        return rjsmin.jsmin
+    return minify or None
+
+
+class _InitScripts:
+    def __init__(self):
+        self._scripts = {}
+        self._injected = set()
+        self._order = itertools.count()
+        # Scripts may be added from any thread while the UI thread flushes.
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._scripts)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._scripts
+
+    def add(self, name: Optional[str], source: str, priority: int = 0,
+            minify: Union[bool, Callable[[str], str]] = False) -> bool:
+        """Register ``source`` as ``name``; returns False if its content is already registered.
+
+        Without a name, the script is named after its content hash.
+
+        Raises:
+            RuntimeError: If ``name`` was injected with a different source.
+        """
+        minifier = _resolve_minifier(minify)
+        if minifier is not None:
+            source = _minify(minifier, source)
+        script = _InitScript(name, source, priority, next(self._order))
+        if name is None:
+            name = script.name = f"init:{script.digest[:16]}"
+        with self._lock:
+            previous = self._scripts.get(name)
+            if previous is not None:
+                if previous.digest == script.digest:
+                    if not previous.injected:
+                        previous.priority = priority
+                    return False
+                if previous.injected:
+                    raise RuntimeError(f"Init script {name!r} was already injected and cannot be replaced")
+            duplicate = script.digest in self._injected or any(
+                other.digest == script.digest for other in self._scripts.values())
+            self._scripts[name] = script
+        return not duplicate
+
+    def remove(self, name: str):
+        """Unregister a script that has not been injected yet.
+
+        Raises:
+            KeyError: If there is no script called ``name``.
+            RuntimeError: If it was already injected; pages keep running it.
+        """
+        with self._lock:
+            script = self._scripts[name]
+            if script.injected:
+                raise RuntimeError(f"Init script {name!r} was already injected and cannot be removed")
+            del self._scripts[name]
+
+    def discard(self, name: str):
+        """Unregister ``name`` unless it is missing or already injected."""
+        with self._lock:
+            script = self._scripts.get(name)
+            if script is not None and not script.injected:
+                del self._scripts[name]
+
+    def names(self) -> list:
+        """Registered names, in the order their scripts run."""
+        with self._lock:
+            scripts = sorted(self._scripts.values(), key=lambda s: (s.priority, s.order))
+        return [script.name for script in scripts]
+
+    def take(self) -> Optional[str]:
+        """Concatenated source of the scripts not injected yet, marking them injected."""
+        sources = []
+        with self._lock:
+            pending = sorted((s for s in self._scripts.values() if not s.injected),
+                             key=lambda s: (s.priority, s.order))
+            for script in pending:
+                if script.digest in self._injected:
+                    continue
+                self._injected.add(script.digest)
+                script.injected = True
+                # A newline ends trailing line comments, the semicolon
+                # statements that rely on automatic semicolon insertion.
+                sources.append(f"{script.source}\n;")
+        if not sources:
+            return None
+        return "\n".join(sources)
@@ -0,0 +1,262 @@
+"""JavaScript sources injected into the page by ``Webview``."""
+import json
+
+
+def quote(value: str) -> str:
+    """Return ``value`` as a JavaScript string literal."""
+    return json.dumps(value)
+
+
+# Shared helpers for every binding.  Binary arguments (ArrayBuffer, typed
+# arrays, DataView) are sent as {"__bytes__": base64}, and such markers in
+# results come back as Uint8Array.  A {"__stream__": id} result, returned by
+# generator bindings, becomes an async iterator pulling chunks from Python one
+# at a time, one chunk ahead.  __webview_bridge__.call(name, args, {signal,
+# timeout}) makes a call that cancels the Python task when the AbortSignal
+# fires or the timeout (ms) expires.  Arguments are encoded by wrapping
+# window.__webview__.call(); replies that carry a marker are parsed with the
+# reviver by a wrapped window.__webview__.onReply(), which then settles the
+# call's promise itself.
+BRIDGE_SCRIPT = """
+(function () {
+  if (window.__webview_bridge__) return;
+  var KEY = "__bytes__", STREAM_KEY = "__stream__", MARKER = /"__(bytes|stream)__"/;
+  function toBase64(bytes) {
+    if (bytes.toBase64) return bytes.toBase64();
+    var chunks = [];
+    for (var i = 0; i < bytes.length; i += 0x8000) {
+      chunks.push(String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000)));
+    }
+    return btoa(chunks.join(""));
+  }
+  function fromBase64(text) {
+    if (Uint8Array.fromBase64) return Uint8Array.fromBase64(text);
+    var raw = atob(text), bytes = new Uint8Array(raw.length);
+    for (var i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+    return bytes;
+  }
+  function encode(value) {
+    if (value instanceof ArrayBuffer) value = new Uint8Array(value);
+    else if (ArrayBuffer.isView(value)) value = new Uint8Array(value.buffer, value.byteOffset, value.byteLength);
+    else if (Array.isArray(value)) return value.map(encode);
+    else if (value && Object.getPrototypeOf(value) === Object.prototype) {
+      var copy = {};
+      for (var key in value) copy[key] = encode(value[key]);
+      return copy;
+    } else return value;
+    var tagged = {};
+    tagged[KEY] = toBase64(value);
+    return tagged;
+  }
+  function stream(id) {
+    var ahead = null, finished = false;
+    function pull() {
+      var next = window.__webview_stream_next__(id);
+      next.catch(function () {});
+      return next;
+    }
+    var iterator = {
+      next: function () {
+        if (finished) return Promise.resolve({done: true, value: undefined});
+        var current = ahead || pull();
+        ahead = null;
+        return current.then(function (r) {
+          if (r[0]) {
+            finished = true;
+            return {done: true, value: undefined};
+          }
+          ahead = pull();
+          return {done: false, value: r[1]};
+        }, function (err) {
+          finished = true;
+          throw err;
+        });
+      },
+      return: function () {
+        if (!finished) {
+          finished = true;
+          window.__webview_stream_close__(id);
+        }
+        return Promise.resolve({done: true, value: undefined});
+      }
+    };
+    iterator[Symbol.asyncIterator] = function () { return iterator; };
+    return iterator;
+  }
+  function reviver(key, value) {
+    if (value && typeof value === "object" && Object.keys(value).length === 1) {
+      if (typeof value[KEY] === "string") return fromBase64(value[KEY]);
+      if (typeof value[STREAM_KEY] === "number") return stream(value[STREAM_KEY]);
+    }
+    return value;
+  }
+  var page = Math.random().toString(36).slice(2), calls = 0;
+  function call(name, args, options) {
+    options = options || {};
+    var fn = window[name], signal = options.signal, timeout = options.timeout;
+    if (typeof fn !== "function") return Promise.reject(new Error(name + " is not bound"));
+    if (signal && signal.aborted) return Promise.reject(signal.reason);
+    var token = page + ":" + (++calls), marker = {__call__: token};
+    if (timeout) marker.timeout = timeout;
+    var pending = fn.apply(null, (args || []).concat([marker]));
+    if (!signal && !timeout) return pending;
+    return new Promise(function (resolve, reject) {
+      var timer = null;
+      function cleanup() {
+        if (timer) clearTimeout(timer);
+        if (signal) signal.removeEventListener("abort", onAbort);
+      }
+      function abort(reason) {
+        cleanup();
+        window.__webview_cancel__(token);
+        reject(reason);
+      }
+      function onAbort() { abort(signal.reason); }
+      if (signal) signal.addEventListener("abort", onAbort);
+      if (timeout) timer = setTimeout(function () { abort(new Error(name + " timed out after " + timeout + " ms")); }, timeout);
+      pending.then(function (value) { cleanup(); resolve(value); }, function (err) { cleanup(); reject(err); });
+    });
+  }
+  window.__webview_bridge__ = {encode: encode, reviver: reviver, call: call};
+  var w = window.__webview__;
+  if (!w || !w.call || !w.onReply) return;
+  var nativeCall = w.call, onReply = w.onReply;
+  w.call = function () {
+    return nativeCall.apply(this, Array.prototype.map.call(arguments, encode));
+  };
+  w.onReply = function (id, status, result) {
+    var promise = this._promises && this._promises[id];
+    if (!promise || typeof result !== "string" || !MARKER.test(result)) return onReply.apply(this, arguments);
+    try {
+      result = JSON.parse(result, reviver);
+    } catch (e) {
+      return onReply.apply(this, arguments);
+    }
+    delete this._promises[id];
+    if (status === 0) promise.resolve(result); else promise.reject(result);
+  };
+})();
+"""
+
+# Queues calls made to batched bindings and sends everything queued during one
+# microtask to Python in a single native call.  Python answers with a list of
+# [status, result] pairs in call order.  Requires BRIDGE_SCRIPT.
+BATCH_SCRIPT = """
+(function () {
+  if (window.__webview_batch__) return;
+  var queue = [];
+  function flush() {
+    var calls = queue;
+    queue = [];
+    var bridge = window.__webview_bridge__;
+    window.__webview_batch_call__(calls.map(function (c) { return [c.name, c.args.map(bridge.encode)]; })).then(function (replies) {
+      for (var i = 0; i < calls.length; i++) {
+        if (replies[i][0] === 0) calls[i].resolve(replies[i][1]);
+        else calls[i].reject(replies[i][1]);
+      }
+    }, function (err) {
+      calls.forEach(function (c) { c.reject(err); });
+    });
+  }
+  window.__webview_batch__ = {
+    define: function (name) {
+      window[name] = function () {
+        var args = Array.prototype.slice.call(arguments);
+        return new Promise(function (resolve, reject) {
+          if (queue.push({name: name, args: args, resolve: resolve, reject: reject}) === 1) queueMicrotask(flush);
+        });
+      };
+    }
+  };
+})();
+"""
+
+# Forwards performance.mark()/measure() entries to Python for tracing, in
+# batches of [name, entryType, timeOrigin + startTime, duration] (ms) sent at
+# most every 250 ms, or as soon as 200 are waiting.  Entries are dropped while
+# the trace binding is not bound.
+TRACE_SCRIPT = """
+(function () {
+  if (window.__webview_trace_observer__ || typeof PerformanceObserver === "undefined") return;
+  var buffer = [], timer = null;
+  function flush() {
+    timer = null;
+    var send = window.__webview_trace__, batch = buffer;
+    buffer = [];
+    if (typeof send === "function" && batch.length) send(batch).catch(function () {});
+  }
+  var observer = new PerformanceObserver(function (list) {
+    list.getEntries().forEach(function (e) {
+      buffer.push([e.name, e.entryType, performance.timeOrigin + e.startTime, e.duration]);
+    });
+    if (buffer.length >= 200) flush();
+    else if (timer === null) timer = setTimeout(flush, 250);
+  });
+  observer.observe({entryTypes: ["mark", "measure"]});
+  window.__webview_trace_observer__ = observer;
+})();
+"""
+
+# Collects Navigation Timing, paint timings, long tasks and (where the engine
+# exposes performance.memory) heap samples, and sends them to Python every
+# `interval` ms as one gzip-compressed JSON batch, or as plain JSON where
+# CompressionStream is missing.  Called with the interval: TELEMETRY_SCRIPT + "(5000)".
+TELEMETRY_SCRIPT = """
+(function (interval) {
+  if (window.__webview_telemetry_installed__) return;
+  window.__webview_telemetry_installed__ = true;
+  var queue = [], origin = performance.timeOrigin;
+  function observe(type, record) {
+    try {
+      new PerformanceObserver(function (list) {
+        list.getEntries().forEach(function (e) { queue.push(record(e)); });
+      }).observe({type: type, buffered: true});
+    } catch (e) {}
+  }
+  observe("paint", function (e) {
+    return {type: "paint", name: e.name, ts: origin + e.startTime};
+  });
+  observe("longtask", function (e) {
+    return {type: "longtask", name: e.name, ts: origin + e.startTime, duration: e.duration};
+  });
+  function navigation() {
+    var e = performance.getEntriesByType && performance.getEntriesByType("navigation")[0];
+    if (!e && performance.timing) {
+      var t = performance.timing, s = t.navigationStart;
+      e = {duration: t.loadEventEnd - s, domainLookupStart: t.domainLookupStart - s, domainLookupEnd: t.domainLookupEnd - s,
+           connectStart: t.connectStart - s, connectEnd: t.connectEnd - s, requestStart: t.requestStart - s,
+           responseStart: t.responseStart - s, responseEnd: t.responseEnd - s, domInteractive: t.domInteractive - s,
+           domContentLoadedEventEnd: t.domContentLoadedEventEnd - s, loadEventEnd: t.loadEventEnd - s};
+    }
+    if (!e) return;
+    queue.push({type: "navigation", ts: origin, url: location.href, duration: e.duration,
+                dns: e.domainLookupEnd - e.domainLookupStart, connect: e.connectEnd - e.connectStart,
+                ttfb: e.responseStart - e.requestStart, response: e.responseEnd - e.responseStart,
+                domInteractive: e.domInteractive, domContentLoaded: e.domContentLoadedEventEnd,
+                load: e.loadEventEnd, transferSize: e.transferSize});
+  }
+  // loadEventEnd is only set once the load handlers have run.
+  if (document.readyState === "complete") setTimeout(navigation, 0);
+  else addEventListener("load", function () { setTimeout(navigation, 0); });
+  function send(payload) {
+    var fn = window.__webview_telemetry__;
+    if (typeof fn === "function") fn(payload).catch(function () {});
+  }
+  function flush() {
+    var m = performance.memory;
+    if (m) queue.push({type: "memory", ts: origin + performance.now(), used: m.usedJSHeapSize,
+                       total: m.totalJSHeapSize, limit: m.jsHeapSizeLimit});
+    if (!queue.length) return;
+    var json = JSON.stringify(queue);
+    queue = [];
+    if (typeof CompressionStream === "undefined") { send(json); return; }
+    new Response(new Blob([json]).stream().pipeThrough(new CompressionStream("gzip"))).arrayBuffer().then(function (buffer) {
+      var bytes = new Uint8Array(buffer), s = "";
+      for (var i = 0; i < bytes.length; i += 0x8000) s += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+      send({__bytes__: btoa(s)});
+    }, function () { send(json); });
+  }
+  setInterval(flush, interval);
+  addEventListener("pagehide", flush);
+})
+"""
@@ -0,0 +1,79 @@
+from collections import deque
+from typing import Any, Callable, Optional
+
+OVERFLOW_POLICIES = ("reject", "drop_oldest", "wait")
+
+
+class _Limiter:
+    """Caps the in-flight calls of one binding and queues the rest.
+
+    When the queue is full a new call is rejected (``"reject"``), the oldest
+    queued call is rejected to make room (``"drop_oldest"``), or the call is
+    queued anyway (``"wait"``, which therefore takes no ``max_queue``).
+    Everything runs on the UI thread.
+    """
+
+    def __init__(self, name: str, max_concurrency: Optional[int] = None, max_queue: Optional[int] = None,
+                 overflow: str = "reject"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if max_queue is not None and max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+        if max_queue is not None and overflow == "wait":
+            raise ValueError("overflow='wait' queues without a bound, so it cannot be combined with max_queue")
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.running = 0
+        self.rejected = 0
+        self.dropped = 0
+        self._queue = deque()
+
+    def overloaded(self) -> dict:
+        """Structured error the page receives for a shed call."""
+        return {
+            "code": "overloaded",
+            "binding": self.name,
+            "message": f"{self.name} is overloaded ({self.running} running, {len(self._queue)} queued)",
+        }
+
+    def submit(self, call: Any, start: Callable[[], None], reject: Callable[[dict], None]):
+        if self.max_concurrency is None or self.running < self.max_concurrency:
+            self.running += 1
+            start()
+            return
+        if self.max_queue is not None and len(self._queue) >= self.max_queue:
+            error = self.overloaded()
+            if self.overflow == "reject" or not self._queue:
+                self.rejected += 1
+                reject(error)
+                return
+            _, _, dropped_reject = self._queue.popleft()
+            self.dropped += 1
+            dropped_reject(error)
+        self._queue.append((call, start, reject))
+
+    def discard(self, call: Any):
+        """Forget a queued call that was cancelled before it started."""
+        for entry in self._queue:
+            if entry[0] is call:
+                self._queue.remove(entry)
+                return
+
+    def release(self):
+        self.running -= 1
+        while self._queue and (self.max_concurrency is None or self.running < self.max_concurrency):
+            _, start, _ = self._queue.popleft()
+            self.running += 1
+            start()
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._queue),
+            "running": self.running,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,156 @@
+"""Per-binding deterministic profiling with ``cProfile``.
+
+Only the callback itself runs under the profiler, and only while profiling of
+its binding is switched on; stats add up across calls until dumped.  For
+coroutine bindings each step between two awaits is profiled, so time spent
+waiting is not counted.
+"""
+import cProfile
+import io
+import os
+import pstats
+import threading
+import types
+from typing import Callable
+
+# cProfile can only hook one call at a time; calls made while another
+# profiled call is running (on a worker thread, or of another binding) run
+# unprofiled and are counted as skipped.
+_active = threading.Lock()
+
+
+class _Profiler:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.calls = 0
+        self.skipped = 0
+        self.stale = False
+        self._snapshot = pstats.Stats(stream=io.StringIO())
+
+    def _enter(self) -> bool:
+        if not _active.acquire(blocking=False):
+            self.skipped += 1
+            return False
+        try:
+            self.profile.enable()
+        except ValueError:
+            # Another profiler (sys.setprofile or sys.monitoring) owns the hook.
+            _active.release()
+            self.skipped += 1
+            return False
+        return True
+
+    def call(self, fn: Callable, args: tuple):
+        if not self._enter():
+            return fn(*args)
+        try:
+            return fn(*args)
+        finally:
+            # Inline rather than a helper, which would show up in the profile.
+            self.profile.disable()
+            _active.release()
+            self.calls += 1
+
+    @types.coroutine
+    def call_async(self, coro):
+        """Await ``coro``, profiling each of its steps."""
+        send, error = None, None
+        try:
+            while True:
+                profiled = self._enter()
+                try:
+                    if error is not None:
+                        step = coro.throw(error)
+                    else:
+                        step = coro.send(send)
+                except StopIteration as stop:
+                    return stop.value
+                finally:
+                    if profiled:
+                        self.profile.disable()
+                        _active.release()
+                try:
+                    send, error = (yield step), None
+                except BaseException as e:
+                    send, error = None, e
+        finally:
+            self.calls += 1
+
+    def stats(self) -> pstats.Stats:
+        """Stats collected so far, without waiting for a profiled call to end.
+
+        The profile can only be read between profiled calls.  While one is
+        running, possibly the caller's own, the stats from the last time they
+        could be read are returned instead and ``stale`` is set.
+        """
+        if not _active.acquire(blocking=False):
+            self.stale = True
+            return self._snapshot
+        try:
+            stats = pstats.Stats(stream=io.StringIO())
+            self.profile.create_stats()
+            if self.profile.stats:
+                stats.add(self.profile)
+        finally:
+            _active.release()
+        self._snapshot, self.stale = stats, False
+        return stats
+
+    def reset(self):
+        self.profile = cProfile.Profile()
+        self.calls = 0
+        self.skipped = 0
+        self.stale = False
+        self._snapshot = pstats.Stats(stream=io.StringIO())
+
+    def dump(self, path: str, format: str = "pstats"):
+        if format == "pstats":
+            self.stats().dump_stats(path)
+        elif format == "collapsed":
+            with open(path, "w") as f:
+                for stack, microseconds in collapse(self.stats().stats).items():
+                    f.write(f"{stack} {microseconds}\n")
+        else:
+            raise ValueError(f"Unknown profile format {format!r}, expected 'pstats' or 'collapsed'")
+
+
+def _label(func: tuple) -> str:
+    filename, line, name = func
+    if filename != "~":
+        name = f"{name} ({os.path.basename(filename)}:{line})"
+    return name.replace(";", ",")
+
+
+def collapse(stats: dict, max_depth: int = 64) -> dict:
+    """Turn pstats data into collapsed stacks (``"a;b;c" -> microseconds``).
+
+    cProfile keeps caller/callee pairs, not whole stacks, so a function's time
+    under each caller is split in proportion to that caller's share of its
+    cumulative time, the way flameprof and gprof2dot do.
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+    roots = [func for func, (_, _, _, _, callers) in stats.items() if not callers]
+    stacks = {}
+
+    def walk(func: tuple, path: list, cumulative: float):
+        _, _, self_time, total, _ = stats[func]
+        path = path + [_label(func)]
+        share = cumulative / total if total else 0.0
+        if self_time * share > 0:
+            key = ";".join(path)
+            stacks[key] = stacks.get(key, 0.0) + self_time * share * 1e6
+        if len(path) >= max_depth:
+            return
+        for callee in callees.get(func, ()):
+            if _label(callee) in path:
+                continue
+            edge = stats[callee][4][func][3]
+            if edge * share > 0:
+                walk(callee, path, edge * share)
+
+    for root in roots:
+        walk(root, [], stats[root][3])
+    return {stack: round(microseconds) for stack, microseconds in stacks.items() if round(microseconds) > 0}
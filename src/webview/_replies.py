@@ -0,0 +1,86 @@
+import asyncio
+import json
+import threading
+from typing import Callable, Optional
+
+# Resolves a list of [seq, status, result] replies in one evaluation.  The
+# results are JSON strings, exactly what webview_return hands to the page, so
+# they go through the same window.__webview__.onReply() entry point.  Older
+# libwebview builds keep their promises in window._rpc instead.
+_RESOLVE_PREFIX = b"""(function (replies) {
+  var w = window.__webview__;
+  for (var i = 0; i < replies.length; i++) {
+    var r = replies[i];
+    if (w && w.onReply) { w.onReply(r[0], r[1], r[2]); continue; }
+    var p = window._rpc[r[0]], b = window.__webview_bridge__;
+    var result = JSON.parse(r[2], b && b.reviver);
+    delete window._rpc[r[0]];
+    if (r[1] === 0) p.resolve(result); else p.reject(result);
+  }
+})(["""
+_RESOLVE_SUFFIX = b"])"
+
+
+class _ReplyCoalescer:
+    """Collects ``(seq, status, result)`` replies and resolves them together.
+
+    Replies added while an asyncio loop is running are flushed once per loop
+    iteration, otherwise through ``schedule`` (one native loop iteration) when
+    given.  Without either, or once ``max_pending`` replies are waiting, they
+    are flushed right away.  A flush of a single reply goes through
+    ``webview_return`` as usual, larger ones through a single ``webview_eval``.
+    """
+
+    def __init__(self, return_: Callable[[bytes, int, bytes], None], eval_: Callable[[bytes], None],
+                 max_pending: int = 64, schedule: Optional[Callable[[Callable[[], None]], None]] = None):
+        self._return = return_
+        self._schedule = schedule
+        self._eval = eval_
+        self.max_pending = max_pending
+        self._pending = []
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def pending_bytes(self) -> int:
+        with self._lock:
+            return sum(len(result) for _, _, result in self._pending)
+
+    def add(self, seq: bytes, status: int, result: bytes):
+        with self._lock:
+            self._pending.append((seq, status, result))
+            if len(self._pending) >= self.max_pending:
+                schedule = False
+                flush_now = True
+            else:
+                schedule = not self._scheduled
+                flush_now = False
+                self._scheduled = True
+        if flush_now:
+            self.flush()
+            return
+        if schedule:
+            try:
+                asyncio.get_running_loop().call_soon(self.flush)
+            except RuntimeError:
+                if self._schedule is not None:
+                    self._schedule(self.flush)
+                else:
+                    self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._scheduled = False
+        if not pending:
+            return
+        if len(pending) == 1:
+            self._return(*pending[0])
+            return
+        entries = b",".join(
+            b"[%s,%d,%s]" % (json.dumps(seq.decode()).encode(), status, json.dumps(result.decode()).encode())
+            for seq, status, result in pending
+        )
+        self._eval(_RESOLVE_PREFIX + entries + _RESOLVE_SUFFIX)
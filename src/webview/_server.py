@@ -0,0 +1,277 @@
+"""Loopback HTTP server for app bundles on disk or in memory.
+
+Serving a bundle over ``http://127.0.0.1`` instead of ``file://`` makes ES
+module imports, ``fetch()`` and the HTTP cache work as in a browser.  Files
+are revalidated with ETag/Last-Modified, so a reload costs a 304 per file;
+bodies go out with ``socket.sendfile()`` (``os.sendfile`` where available).
+Assets of an ``AssetRegistry`` are served from memory instead.  With
+compression on, clients that accept it get precompressed gzip/brotli
+variants from the disk cache of ``_compress``.
+Connections are kept alive (HTTP/1.1) and each is served on its own thread.
+"""
+import io
+import logging
+import mimetypes
+import os
+import threading
+from functools import partial
+from typing import Optional
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit, urlunsplit
+from ._compress import _VariantCache, accepted_encodings, compressible
+
+# Types that matter for a web app, independent of the platform's mime database
+# (on Windows the registry may map .js to text/plain, breaking module scripts).
+_MIME_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".htm": "text/html; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".mjs": "text/javascript; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".json": "application/json",
+    ".map": "application/json",
+    ".webmanifest": "application/manifest+json",
+    ".wasm": "application/wasm",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+    ".ico": "image/x-icon",
+    ".woff": "font/woff",
+    ".woff2": "font/woff2",
+    ".ttf": "font/ttf",
+    ".otf": "font/otf",
+    ".txt": "text/plain; charset=utf-8",
+    ".xml": "application/xml",
+    ".mp4": "video/mp4",
+    ".webm": "video/webm",
+    ".mp3": "audio/mpeg",
+    ".ogg": "audio/ogg",
+    ".wav": "audio/wav",
+}
+_IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _etag(tag: str, variant: Optional[tuple]) -> str:
+    # Each encoding of a file is a different representation with its own tag.
+    return f'"{tag}-{variant[0]}"' if variant is not None else f'"{tag}"'
+
+
+def _guess_type(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    return _MIME_TYPES.get(ext) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    extensions_map = {**SimpleHTTPRequestHandler.extensions_map, **_MIME_TYPES}
+
+    def _allowed(self) -> bool:
+        # Pages elsewhere can reach a loopback port through DNS rebinding;
+        # only answer requests addressed to this server.
+        if self.headers.get("Host") in self.server.hosts:
+            return True
+        self.send_error(HTTPStatus.FORBIDDEN)
+        return False
+
+    def _redirect_to_directory(self, parts):
+        self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+        self.send_header("Location", urlunsplit(parts._replace(path=parts.path + "/")))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send_not_modified(self, etag: str, cache_control: str):
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        self.end_headers()
+
+    def _not_modified(self, etag: str, last_modified: Optional[str] = None) -> bool:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags or f"W/{etag}" in tags
+        return last_modified is not None and self.headers.get("If-Modified-Since") == last_modified
+
+    def _variant(self, key, source, content_type: str, size: int) -> Optional[tuple]:
+        variants = self.server.variants
+        if variants is None or not compressible(content_type, size):
+            return None
+        return variants.find(key, source, accepted_encodings(self.headers.get("Accept-Encoding")))
+
+    def _open_variant(self, variant: Optional[tuple]):
+        if variant is None:
+            return None
+        try:
+            return open(variant[1], "rb")
+        except OSError:
+            # The cache directory was cleaned up under us.
+            return None
+
+    def _send_ok(self, content_type: str, length: int, etag: str, cache_control: str,
+                 encoding: Optional[str] = None, last_modified: Optional[str] = None):
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(length))
+        self._length = length
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        if self.server.variants is not None and compressible(content_type, length):
+            self.send_header("Vary", "Accept-Encoding")
+        if last_modified is not None:
+            self.send_header("Last-Modified", last_modified)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        self.end_headers()
+
+    def copyfile(self, source, outputfile):
+        # Zero-copy from the page cache to the socket where the OS allows it.
+        # Bounded by Content-Length, in case the file grew since fstat().
+        self.connection.sendfile(source, count=self._length)
+
+    def _spa_route(self, parts) -> bool:
+        """Whether a missing path gets the index page: client-side routes have no extension."""
+        return self.server.spa and not os.path.splitext(parts.path)[1]
+
+    def log_message(self, format, *args):
+        logging.debug("webview assets: " + format, *args)
+
+
+class _DirectoryHandler(_Handler):
+    def send_head(self):
+        if not self._allowed():
+            return None
+        parts = urlsplit(self.path)
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not parts.path.endswith("/"):
+                self._redirect_to_directory(parts)
+                return None
+            path = os.path.join(path, self.server.index)
+        try:
+            f = open(path, "rb")
+        except OSError:
+            if not self._spa_route(parts):
+                self.send_error(HTTPStatus.NOT_FOUND)
+                return None
+            # Client-side routes of a single page app all get the index page.
+            path = os.path.join(self.server.root, self.server.index)
+            try:
+                f = open(path, "rb")
+            except OSError:
+                self.send_error(HTTPStatus.NOT_FOUND)
+                return None
+        try:
+            st = os.fstat(f.fileno())
+            content_type = self.guess_type(path)
+            variant = self._variant((path, st.st_mtime_ns, st.st_size), path, content_type, st.st_size)
+            etag = _etag(f"{st.st_mtime_ns:x}-{st.st_size:x}", variant)
+            last_modified = self.date_time_string(int(st.st_mtime))
+            # Cache, but revalidate: edits to the bundle show up on reload.
+            if self._not_modified(etag, last_modified):
+                f.close()
+                self._send_not_modified(etag, "no-cache")
+                return None
+            compressed = self._open_variant(variant)
+            if compressed is not None:
+                f.close()
+                f = compressed
+                self._send_ok(content_type, variant[2], etag, "no-cache", variant[0], last_modified)
+            else:
+                etag = _etag(f"{st.st_mtime_ns:x}-{st.st_size:x}", None)
+                self._send_ok(content_type, st.st_size, etag, "no-cache", last_modified=last_modified)
+            return f
+        except Exception:
+            f.close()
+            raise
+
+
+class _MemoryHandler(_Handler):
+    def send_head(self):
+        if not self._allowed():
+            return None
+        parts = urlsplit(self.path)
+        path = unquote(parts.path)
+        assets = self.server.assets
+        if path.endswith("/"):
+            found = assets.lookup(path + self.server.index)
+        else:
+            found = assets.lookup(path)
+            if found is None and assets.lookup(f"{path}/{self.server.index}") is not None:
+                self._redirect_to_directory(parts)
+                return None
+        if found is None and self._spa_route(parts):
+            found = assets.lookup(self.server.index)
+        if found is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+        asset, hashed = found
+        # Content-hash paths never change content; named paths revalidate.
+        cache_control = _IMMUTABLE if hashed else "no-cache"
+        variant = self._variant(asset.digest, asset.data, asset.content_type, len(asset.data))
+        etag = _etag(asset.digest, variant)
+        if self._not_modified(etag):
+            self._send_not_modified(etag, cache_control)
+            return None
+        compressed = self._open_variant(variant)
+        if compressed is not None:
+            self._send_ok(asset.content_type, variant[2], etag, cache_control, variant[0])
+            return compressed
+        self._send_ok(asset.content_type, len(asset.data), asset.etag, cache_control)
+        return io.BytesIO(asset.data)
+
+    def copyfile(self, source, outputfile):
+        if isinstance(source, io.BytesIO):
+            # The BytesIO shares the asset's bytes, nothing is copied.
+            outputfile.write(source.getvalue())
+        else:
+            super().copyfile(source, outputfile)
+
+
+class _AssetServer(ThreadingHTTPServer):
+    """Serves a directory or an ``AssetRegistry`` on ``127.0.0.1`` from a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, source, port: int = 0, index: str = "index.html", spa: bool = False,
+                 compress: bool = False, cache_dir: Optional[str] = None):
+        self.index = index
+        self.spa = spa
+        if isinstance(source, (str, os.PathLike)):
+            self.root = os.path.abspath(source)
+            if not os.path.isdir(self.root):
+                raise FileNotFoundError(f"No such directory: {source}")
+            self.assets = None
+            handler = partial(_DirectoryHandler, directory=self.root)
+        else:
+            self.root = None
+            self.assets = source
+            handler = _MemoryHandler
+        super().__init__(("127.0.0.1", port), handler)
+        self.variants = _VariantCache(cache_dir) if compress else None
+        port = self.server_address[1]
+        self.hosts = {f"127.0.0.1:{port}", f"localhost:{port}"}
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    def start(self):
+        # A short poll interval keeps shutdown() from delaying destroy().
+        self._thread = threading.Thread(target=self.serve_forever, args=(0.1,), name="webview-assets", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+        if self.variants is not None:
+            self.variants.stop()
@@ -0,0 +1,106 @@
+import time
+from typing import Optional
+
+# Log-linear buckets: values below 16 ns get their own bucket, larger ones keep
+# their top 4 significant bits, i.e. 8 buckets per power of two (<= 12.5%
+# relative error).
+_SUB_BITS = 3
+_SUB = 1 << _SUB_BITS
+_BUCKETS = 64 * _SUB + 2 * _SUB
+
+
+def _bucket(ns: int) -> int:
+    shift = ns.bit_length() - _SUB_BITS - 1
+    if shift <= 0:
+        return ns
+    return (shift << _SUB_BITS) + (ns >> shift)
+
+
+def _bucket_bounds(index: int):
+    if index < 2 * _SUB:
+        return index, index + 1
+    shift = (index >> _SUB_BITS) - 1
+    mantissa = (index & (_SUB - 1)) + _SUB
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class _Histogram:
+    """Fixed-size latency histogram, recording costs one index computation."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns: int):
+        if ns < 0:
+            ns = 0
+        self.counts[_bucket(ns)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Approximate ``q`` percentile in nanoseconds (bucket midpoint)."""
+        if not self.count:
+            return None
+        rank = max(1, q / 100.0 * self.count)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                low, high = _bucket_bounds(index)
+                return min((low + high) / 2, self.max)
+        return float(self.max)
+
+    def summary(self) -> dict:
+        """Counts and latencies in milliseconds."""
+        ms = 1e-6
+        if not self.count:
+            return {"count": 0, "mean_ms": None, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * ms,
+            "p50_ms": self.percentile(50) * ms,
+            "p95_ms": self.percentile(95) * ms,
+            "p99_ms": self.percentile(99) * ms,
+            "max_ms": self.max * ms,
+        }
+
+
+class _BindingStats:
+    """Per-phase timings of one binding: decode, callback, encode and return."""
+
+    PHASES = ("decode", "callback", "encode", "return")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.errors = 0
+        self.phases = {phase: _Histogram() for phase in self.PHASES}
+        self.decode, self.callback, self.encode, self.return_ = (self.phases[phase] for phase in self.PHASES)
+
+    def record_callback(self, ns: int, success: bool):
+        self.calls += 1
+        if not success:
+            self.errors += 1
+        self.callback.record(ns)
+
+    def summary(self) -> dict:
+        result = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": self.errors / self.calls if self.calls else 0.0,
+        }
+        for phase, histogram in self.phases.items():
+            result[phase] = histogram.summary()
+        return result
+
+
+now_ns = time.perf_counter_ns
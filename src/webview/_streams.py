@@ -0,0 +1,66 @@
+import asyncio
+from typing import Any, Callable, Iterator, Union, AsyncIterator
+
+STREAM_KEY = "__stream__"
+
+
+class _Stream:
+    """A generator or async generator result, consumed by the page chunk by chunk.
+
+    The page pulls one chunk at a time (reading at most one chunk ahead), so the
+    generator only advances when JavaScript is ready for more data.
+    """
+
+    def __init__(self, stream_id: int, binding: Any, iterator: Union[Iterator, AsyncIterator]):
+        self.id = stream_id
+        self.binding = binding
+        self.iterator = iterator
+        self.is_async = hasattr(iterator, "__anext__")
+        self._pulling = False
+        self._close_pending = False
+
+    def pull(self, done: Callable[[bool, Any], None]):
+        """Advance the iterator and report ``[finished, chunk]`` to ``done``."""
+        if not self.is_async:
+            try:
+                chunk = next(self.iterator)
+            except StopIteration:
+                done(True, [True, None])
+            except Exception as e:
+                done(False, e)
+            else:
+                done(True, [False, chunk])
+            return
+
+        async def step():
+            self._pulling = True
+            try:
+                chunk = await self.iterator.__anext__()
+            except StopAsyncIteration:
+                done(True, [True, None])
+            except Exception as e:
+                done(False, e)
+            else:
+                done(True, [False, chunk])
+            finally:
+                self._pulling = False
+                if self._close_pending:
+                    self.close()
+        try:
+            asyncio.get_running_loop().create_task(step())
+        except RuntimeError as e:
+            done(False, e)
+
+    def close(self):
+        if not self.is_async:
+            self.iterator.close()
+        elif self._pulling:
+            # aclose() is not allowed while __anext__() is running.
+            self._close_pending = True
+        else:
+            self._close_pending = False
+            try:
+                asyncio.ensure_future(self.iterator.aclose())
+            except RuntimeError:
+                # No event loop to finalize the generator on.
+                pass
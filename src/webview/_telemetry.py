@@ -0,0 +1,55 @@
+import gzip
+import json
+import threading
+from collections import deque
+from typing import Optional, Union
+
+
+class _TelemetryBuffer:
+    """Bounded ring buffer of performance records reported by the page.
+
+    Batches arrive as gzip-compressed JSON (``bytes``) or as a JSON string;
+    once ``capacity`` records are held the oldest ones are dropped.
+    """
+
+    def __init__(self, capacity: int = 10_000):
+        self._records = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.received = 0
+        self.dropped = 0
+        self.wire_bytes = 0
+
+    def __len__(self):
+        return len(self._records)
+
+    def add_batch(self, payload: Union[bytes, str]):
+        self.wire_bytes += len(payload)
+        if isinstance(payload, (bytes, bytearray)):
+            payload = gzip.decompress(payload)
+        records = json.loads(payload)
+        if not isinstance(records, list):
+            raise ValueError("telemetry batch must be a list of records")
+        with self._lock:
+            self.batches += 1
+            self.received += len(records)
+            self.dropped += max(0, len(self._records) + len(records) - self._records.maxlen)
+            self._records.extend(records)
+
+    def records(self, type: Optional[str] = None, clear: bool = False) -> list:
+        with self._lock:
+            records = list(self._records)
+            if clear:
+                self._records.clear()
+        if type is not None:
+            records = [record for record in records if record.get("type") == type]
+        return records
+
+    def stats(self) -> dict:
+        return {
+            "records": len(self._records),
+            "batches": self.batches,
+            "received": self.received,
+            "dropped": self.dropped,
+            "wire_bytes": self.wire_bytes,
+        }
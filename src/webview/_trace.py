@@ -0,0 +1,94 @@
+"""Chrome Trace Event recording of bridge activity.
+
+Events use the `Trace Event Format
+<https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU>`_
+and open in Perfetto or ``chrome://tracing``.  Python events carry the native
+thread id; page events (``performance.mark``/``measure``) are put on a
+separate "page" track, their timestamps moved onto the same clock.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+from ._stats import now_ns
+
+# Track for events reported by the page.
+_PAGE_TID = 0
+
+
+class _Tracer:
+    """Collects trace events; recording is an append to a bounded deque."""
+
+    def __init__(self, max_events: int = 1_000_000):
+        self._events = deque(maxlen=max_events)
+        self._pid = os.getpid()
+        # performance.timeOrigin + startTime is a wall clock time in ms.
+        self._wall_offset_ns = time.time_ns() - now_ns()
+        self._threads = {}
+
+    def __len__(self):
+        return len(self._events)
+
+    def _tid(self) -> int:
+        tid = threading.get_native_id()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        return tid
+
+    def complete(self, name: str, cat: str, start_ns: int, end_ns: Optional[int] = None, args: Optional[dict] = None):
+        """Record a span that started at ``start_ns`` and ends at ``end_ns`` (now by default)."""
+        if end_ns is None:
+            end_ns = now_ns()
+        event = {"name": name, "cat": cat, "ph": "X", "ts": start_ns / 1000, "dur": (end_ns - start_ns) / 1000,
+                 "pid": self._pid, "tid": self._tid()}
+        if args:
+            event["args"] = args
+        self._events.append(event)
+
+    def async_span(self, name: str, cat: str, id: Any, start_ns: int, end_ns: Optional[int] = None,
+                   args: Optional[dict] = None):
+        """Record a span that did not run on one thread's stack, e.g. an async call."""
+        if end_ns is None:
+            end_ns = now_ns()
+        tid = self._tid()
+        begin = {"name": name, "cat": cat, "ph": "b", "id": str(id), "ts": start_ns / 1000,
+                 "pid": self._pid, "tid": tid}
+        if args:
+            begin["args"] = args
+        self._events.append(begin)
+        self._events.append({"name": name, "cat": cat, "ph": "e", "id": str(id), "ts": end_ns / 1000,
+                             "pid": self._pid, "tid": tid})
+
+    def instant(self, name: str, cat: str, args: Optional[dict] = None):
+        event = {"name": name, "cat": cat, "ph": "i", "s": "t", "ts": now_ns() / 1000,
+                 "pid": self._pid, "tid": self._tid()}
+        if args:
+            event["args"] = args
+        self._events.append(event)
+
+    def add_page_entries(self, entries: list):
+        """Record ``[name, entryType, epoch_ms, duration_ms]`` entries sent by the page."""
+        offset_us = self._wall_offset_ns / 1000
+        for name, entry_type, epoch_ms, duration_ms in entries:
+            ts = epoch_ms * 1000 - offset_us
+            if entry_type == "measure":
+                event = {"name": name, "cat": "page", "ph": "X", "ts": ts, "dur": duration_ms * 1000}
+            else:
+                event = {"name": name, "cat": "page", "ph": "i", "s": "t", "ts": ts}
+            event["pid"] = self._pid
+            event["tid"] = _PAGE_TID
+            self._events.append(event)
+
+    def to_dict(self) -> dict:
+        metadata = [{"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+                    for tid, name in list(self._threads.items())]
+        metadata.append({"name": "thread_name", "ph": "M", "pid": self._pid, "tid": _PAGE_TID,
+                         "args": {"name": "page"}})
+        return {"traceEvents": metadata + list(self._events), "displayTimeUnit": "ms"}
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
@@ -0,0 +1,128 @@
+"""Detection of callbacks that hold the UI thread for too long.
+
+Every native callback and every round of dispatched work is timed.  Those
+that exceed ``budget_ms`` are reported as stalls; a monitor thread captures
+the Python stack of the UI thread while a call is still running past
+``severe_ms``, so the report shows where it was stuck rather than where it
+ended up.
+"""
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Callable, Optional
+
+from ._stats import now_ns
+
+
+class _Call:
+    __slots__ = ("name", "start", "thread", "stack")
+
+    def __init__(self, name: str, start: int, thread: int):
+        self.name = name
+        self.start = start
+        self.thread = thread
+        self.stack = None
+
+
+class _StallWatchdog:
+    def __init__(self, budget_ms: float = 16.0, severe_ms: float = 250.0,
+                 on_stall: Optional[Callable[[dict], None]] = None, keep: int = 50):
+        self.budget_ms = budget_ms
+        self.severe_ms = severe_ms
+        self.on_stall = on_stall
+        self._budget_ns = int(budget_ms * 1e6)
+        self._severe_ns = int(severe_ms * 1e6)
+        self._current = None
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._recent = deque(maxlen=keep)
+        self._by_name = {}
+        self.stalls = 0
+        self.severe = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self._thread = threading.Thread(target=self._monitor, name="webview-watchdog", daemon=True)
+        self._thread.start()
+
+    def begin(self, name: str) -> Optional[_Call]:
+        """Start timing a call on the current thread; pass the result to ``end()``."""
+        if self._current is not None:
+            # Nested inside a call that is already being timed.
+            return None
+        call = _Call(name, now_ns(), threading.get_ident())
+        with self._cond:
+            self._current = call
+            self._cond.notify()
+        return call
+
+    def end(self, call: Optional[_Call]):
+        if call is None:
+            return
+        elapsed = now_ns() - call.start
+        with self._cond:
+            self._current = None
+            self._cond.notify()
+        if elapsed > self._budget_ns:
+            self._report(call, elapsed)
+
+    def _report(self, call: _Call, elapsed: int):
+        severe = elapsed > self._severe_ns
+        event = {
+            "binding": call.name,
+            "duration_ms": elapsed / 1e6,
+            "ts": time.time(),
+            "severe": severe,
+            "stack": call.stack,
+        }
+        self.stalls += 1
+        self.severe += severe
+        self.total_ns += elapsed
+        self.max_ns = max(self.max_ns, elapsed)
+        self._by_name[call.name] = self._by_name.get(call.name, 0) + 1
+        self._recent.append(event)
+        if severe and call.stack:
+            logging.warning("webview: %s held the UI thread for %.1f ms (budget %.1f ms), stack:\n%s",
+                            call.name, elapsed / 1e6, self.budget_ms, "".join(call.stack))
+        else:
+            logging.warning("webview: %s held the UI thread for %.1f ms (budget %.1f ms)",
+                            call.name, elapsed / 1e6, self.budget_ms)
+        if self.on_stall is not None:
+            try:
+                self.on_stall(event)
+            except Exception:
+                logging.exception("webview: on_stall callback failed")
+
+    def _monitor(self):
+        with self._cond:
+            while not self._stopped:
+                call = self._current
+                if call is None or call.stack is not None:
+                    self._cond.wait()
+                    continue
+                remaining = call.start + self._severe_ns - now_ns()
+                if remaining > 0:
+                    self._cond.wait(remaining / 1e9)
+                    continue
+                frame = sys._current_frames().get(call.thread)
+                call.stack = traceback.format_stack(frame) if frame is not None else []
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join()
+
+    def summary(self) -> dict:
+        return {
+            "budget_ms": self.budget_ms,
+            "severe_ms": self.severe_ms,
+            "stalls": self.stalls,
+            "severe": self.severe,
+            "total_ms": self.total_ns / 1e6,
+            "max_ms": self.max_ns / 1e6,
+            "by_binding": dict(self._by_name),
+            "recent": list(self._recent),
+        }
@@ -8,6 +8,8 @@ from ctypes import c_int, c_char_p, c_void_p, CFUNCTYPE
 import ctypes.util
 import shutil
 import logging
+import threading
+from typing import Optional
 def _encode_c_string(s: str) -> bytes:
     return s.encode("utf-8")
 
@@ -179,6 +181,74 @@ class _WebviewLibrary:
         self.webview_return = self.lib.webview_return
         self.webview_return.argtypes = [c_void_p, c_char_p, c_int, c_char_p]
 
+        self.webview_dispatch = self.lib.webview_dispatch
+        self.webview_dispatch.argtypes = [c_void_p, c_void_p, c_void_p]
+
+        # Only in newer libwebview builds; None when the library lacks it.
+        self.webview_set_html = getattr(self.lib, "webview_set_html", None)
+        if self.webview_set_html is not None:
+            self.webview_set_html.argtypes = [c_void_p, c_char_p]
+
         self.CFUNCTYPE = CFUNCTYPE
 
-_webview_lib = _WebviewLibrary()
+def _load_library():
+    """Load the backend selected by ``WEBVIEW_BACKEND`` (``native`` or ``fake``)."""
+    backend = os.getenv("WEBVIEW_BACKEND", "native")
+    if backend == "native":
+        return _WebviewLibrary()
+    if backend == "fake":
+        from ._fake_backend import _FakeWebviewLibrary
+        return _FakeWebviewLibrary()
+    raise ValueError(f"Unknown WEBVIEW_BACKEND {backend!r}, expected 'native' or 'fake'")
+
+class _LazyLibrary:
+    """Stands in for the library until first used, then loads it once.
+
+    Finding (and possibly downloading) the shared library is deferred from
+    ``import webview`` to the first ``Webview()``.  Once loaded, the
+    library's functions are copied onto the proxy, so calls on the hot path
+    are plain attribute lookups.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._target = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._target is not None
+
+    def load(self):
+        """Load the library if needed and return it; safe from any thread."""
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    target = self._factory()
+                    self.__dict__.update(vars(target))
+                    self._target = target
+        return self._target
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+_webview_lib = _LazyLibrary(_load_library)
+
+def preload(background: bool = False) -> Optional[threading.Thread]:
+    """Load the native library ahead of the first ``Webview()``.
+
+    Args:
+        background: Load on a daemon thread instead, e.g. while a splash
+            screen is showing.  Creating a ``Webview`` meanwhile waits for it.
+
+    Returns:
+        Optional[threading.Thread]: The loading thread when ``background``.
+    """
+    if not background:
+        _webview_lib.load()
+        return None
+    thread = threading.Thread(target=_webview_lib.load, name="webview-preload", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,175 @@
+"""In-memory assets for single-file deployments.
+
+An ``AssetRegistry`` holds the files of a web app as bytes, taken from
+memory, from package resources or from a zip file, and
+``Webview.serve_assets()`` serves them over the loopback origin without
+touching the disk.
+
+Every asset is served at two paths: its own (``js/app.js``) for pages that
+reference files by name, revalidated with its content hash as ETag; and a
+content-hash path (``js/app.3f2a1b9c0d1e4a5b.js``, see ``url()``) cached as
+``immutable``, so the engine loads it from its cache without asking again.
+The hashed file stays in the same directory, so relative imports from it
+keep resolving.
+"""
+import hashlib
+import importlib.resources
+import posixpath
+import threading
+import zipfile
+from typing import Optional, Tuple, Union
+from ._server import _guess_type
+
+_SKIPPED_RESOURCES = ("__pycache__", ".py", ".pyc")
+
+
+class _Asset:
+    __slots__ = ("path", "data", "content_type", "digest", "etag")
+
+    def __init__(self, path: str, data: bytes, content_type: str):
+        self.path = path
+        self.data = data
+        self.content_type = content_type
+        self.digest = hashlib.sha256(data).hexdigest()[:16]
+        self.etag = f'"{self.digest}"'
+
+    @property
+    def hashed_path(self) -> str:
+        stem, ext = posixpath.splitext(self.path)
+        return f"{stem}.{self.digest}{ext}"
+
+
+def _normalize(path: str) -> str:
+    path = path.replace("\\", "/").lstrip("/")
+    parts = path.split("/")
+    if not path or ".." in parts or "" in parts[:-1]:
+        raise ValueError(f"Invalid asset path {path!r}")
+    return path
+
+
+class AssetRegistry:
+    """Web app files held in memory, by path relative to the app root."""
+
+    def __init__(self):
+        self._assets = {}
+        self._hashed = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def __contains__(self, path: str) -> bool:
+        return path.lstrip("/") in self._assets
+
+    def add(self, path: str, data: Union[bytes, str], content_type: Optional[str] = None) -> str:
+        """Add or replace one asset.
+
+        Args:
+            path: Path relative to the app root, e.g. ``"js/app.js"``.
+            data: File contents; ``str`` is encoded as UTF-8.
+            content_type: Defaults to the type guessed from the extension.
+
+        Returns:
+            str: The content-hash URL path of the asset, as from ``url()``.
+        """
+        path = _normalize(path)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        asset = _Asset(path, bytes(data), content_type or _guess_type(path))
+        with self._lock:
+            previous = self._assets.get(path)
+            if previous is not None:
+                self._hashed.pop(previous.hashed_path, None)
+            self._assets[path] = asset
+            self._hashed[asset.hashed_path] = asset
+        return "/" + asset.hashed_path
+
+    def add_resources(self, package, directory: str = "", prefix: str = "") -> int:
+        """Add the files below ``directory`` of a package's resources.
+
+        Works for packages installed as directories and from zip files
+        alike.  ``__pycache__`` and Python sources are skipped.
+
+        Args:
+            package: Package name or module, as for ``importlib.resources.files()``.
+            directory: Subdirectory of the package to add, e.g. ``"web"``.
+            prefix: Path under the app root the files are added at.
+
+        Returns:
+            int: Number of files added.
+        """
+        root = importlib.resources.files(package)
+        if directory:
+            root = root.joinpath(*directory.strip("/").split("/"))
+        if not root.is_dir():
+            raise FileNotFoundError(f"No resource directory {directory!r} in {package!r}")
+        return self._add_tree(root, prefix.strip("/"))
+
+    def _add_tree(self, node, prefix: str) -> int:
+        count = 0
+        for child in node.iterdir():
+            if child.name.endswith(_SKIPPED_RESOURCES):
+                continue
+            path = f"{prefix}/{child.name}" if prefix else child.name
+            if child.is_dir():
+                count += self._add_tree(child, path)
+            else:
+                self.add(path, child.read_bytes())
+                count += 1
+        return count
+
+    def add_zip(self, file: Union[str, zipfile.ZipFile], directory: str = "", prefix: str = "") -> int:
+        """Add the files below ``directory`` of a zip archive.
+
+        Args:
+            file: Path of the archive, or an open ``ZipFile``.
+            directory: Directory inside the archive to add.
+            prefix: Path under the app root the files are added at.
+
+        Returns:
+            int: Number of files added.
+        """
+        directory = directory.strip("/")
+        prefix = prefix.strip("/")
+        archive = file if isinstance(file, zipfile.ZipFile) else zipfile.ZipFile(file)
+        try:
+            count = 0
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                name = info.filename
+                if directory:
+                    if not name.startswith(directory + "/"):
+                        continue
+                    name = name[len(directory) + 1:]
+                self.add(f"{prefix}/{name}" if prefix else name, archive.read(info))
+                count += 1
+            return count
+        finally:
+            if archive is not file:
+                archive.close()
+
+    def remove(self, path: str):
+        path = _normalize(path)
+        with self._lock:
+            asset = self._assets.pop(path)
+            self._hashed.pop(asset.hashed_path, None)
+
+    def url(self, path: str) -> str:
+        """Content-hash URL path of an asset, for HTML generated in Python.
+
+        Raises:
+            KeyError: If there is no asset at ``path``.
+        """
+        return "/" + self._assets[_normalize(path)].hashed_path
+
+    def lookup(self, path: str) -> Optional[Tuple[_Asset, bool]]:
+        """Asset for a request path, and whether it was its content-hash path."""
+        path = path.lstrip("/")
+        asset = self._assets.get(path)
+        if asset is not None:
+            return asset, False
+        asset = self._hashed.get(path)
+        if asset is not None:
+            return asset, True
+        return None
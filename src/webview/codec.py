@@ -0,0 +1,187 @@
+"""Serializers used on the bind/return hot path.
+
+A codec turns the raw request bytes handed over by the native callback into
+the Python arguments of a bound function, and the function result back into
+the bytes passed to ``webview_return``.  Anything exposing
+``loads(bytes) -> Any`` and ``dumps(obj) -> bytes`` can be used, including the
+``orjson`` module itself.
+
+Binary values (``bytes``, ``bytearray``, ``memoryview``) travel as
+``{"__bytes__": "<base64>"}``, which the page turns into a ``Uint8Array``; the
+page sends ``Uint8Array``/``ArrayBuffer`` arguments back the same way.
+"""
+import base64
+import binascii
+import json
+from typing import Any, Callable, Optional, Union
+
+
+BINARY_KEY = "__bytes__"
+# Cheap pre-check on raw request bytes before walking decoded arguments.
+_BINARY_MARKER = b'"__bytes__"'
+_BINARY_TYPES = (bytes, bytearray, memoryview)
+
+
+def encode_binary(value) -> dict:
+    """JSON-compatible form of a bytes-like ``value``."""
+    return {BINARY_KEY: base64.b64encode(value).decode("ascii")}
+
+
+def encode_binary_payload(value) -> bytes:
+    """Encoded reply for a bytes-like result, without going through a codec."""
+    return b'{"__bytes__":"' + base64.b64encode(value) + b'"}'
+
+
+def _default(obj):
+    if isinstance(obj, _BINARY_TYPES):
+        return encode_binary(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _revive(obj):
+    if isinstance(obj, list):
+        return [_revive(item) for item in obj]
+    if isinstance(obj, dict):
+        if len(obj) == 1 and BINARY_KEY in obj:
+            try:
+                return base64.b64decode(obj[BINARY_KEY], validate=True)
+            except (binascii.Error, TypeError, ValueError):
+                return obj
+        return {key: _revive(value) for key, value in obj.items()}
+    return obj
+
+
+def revive_binary(data: bytes, obj: Any) -> Any:
+    """Replace binary markers in ``obj`` decoded from ``data`` with ``bytes``."""
+    if _BINARY_MARKER not in data:
+        return obj
+    return _revive(obj)
+
+
+class Codec:
+    """Bytes-in/bytes-out serializer for the JS <-> Python bridge."""
+
+    name = "custom"
+
+    def __init__(self, loads: Callable[[bytes], Any], dumps: Callable[[Any], Any], name: Optional[str] = None):
+        self._loads = loads
+        self._dumps = dumps
+        if name:
+            self.name = name
+
+    def loads(self, data: bytes) -> Any:
+        return self._loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        data = self._dumps(obj)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return data
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+
+class JsonCodec(Codec):
+    """Standard library ``json`` codec, always available."""
+
+    name = "json"
+
+    def __init__(self):
+        encoder = json.JSONEncoder(separators=(",", ":"), default=_default)
+        super().__init__(json.loads, encoder.encode)
+
+    def loads(self, data: bytes) -> Any:
+        # json.loads() detects the encoding of bytes input itself, so there is
+        # no need for an intermediate str copy.
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj).encode("utf-8")
+
+
+class OrjsonCodec(Codec):
+    """Codec backed by `orjson <https://github.com/ijl/orjson>`_."""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        option = orjson.OPT_NON_STR_KEYS
+        super().__init__(orjson.loads, lambda obj: orjson.dumps(obj, default=_default, option=option))
+
+    def loads(self, data: bytes) -> Any:
+        return self._loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj)
+
+
+class MsgspecCodec(Codec):
+    """Codec backed by `msgspec <https://jcristharif.com/msgspec/>`_.
+
+    msgspec encodes nested ``bytes`` as plain base64 strings itself, so only
+    a binary value returned directly by a binding reaches the page as a
+    ``Uint8Array``.
+    """
+
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        super().__init__(msgspec.json.Decoder().decode, msgspec.json.Encoder().encode)
+
+    def loads(self, data: bytes) -> Any:
+        return self._loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj)
+
+
+_NAMED_CODECS = {
+    "json": JsonCodec,
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+}
+
+_default_codec = None
+
+
+def _fastest_codec() -> Codec:
+    for factory in (OrjsonCodec, MsgspecCodec):
+        try:
+            return factory()
+        except ImportError:
+            continue
+    return JsonCodec()
+
+
+def resolve_codec(codec: Union[None, str, Codec, Any] = None) -> Codec:
+    """Turn the ``codec=`` argument of ``Webview``/``bind`` into a ``Codec``.
+
+    Args:
+        codec: ``None`` for the standard library codec, one of ``"json"``,
+            ``"orjson"``, ``"msgspec"`` or ``"auto"`` (fastest installed), a
+            ``Codec`` instance, or any object with ``loads``/``dumps``.
+
+    Returns:
+        Codec: The codec to use.
+    """
+    global _default_codec
+    if codec is None:
+        if _default_codec is None:
+            _default_codec = JsonCodec()
+        return _default_codec
+    if isinstance(codec, Codec):
+        return codec
+    if isinstance(codec, str):
+        if codec == "auto":
+            return _fastest_codec()
+        try:
+            factory = _NAMED_CODECS[codec]
+        except KeyError:
+            raise ValueError(f"Unknown codec {codec!r}, expected one of {sorted(_NAMED_CODECS)} or 'auto'")
+        return factory()
+    if callable(getattr(codec, "loads", None)) and callable(getattr(codec, "dumps", None)):
+        return Codec(codec.loads, codec.dumps, getattr(codec, "__name__", None))
+    raise TypeError(f"codec must be a name, a Codec or an object with loads/dumps, got {codec!r}")
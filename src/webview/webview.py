@@ -1,10 +1,45 @@
 from enum import IntEnum
-from typing import Optional, Callable, Any
-import json
+from typing import Optional, Callable, Any, Union, Awaitable
+import base64
 import ctypes
 import asyncio
 import inspect
+import logging
+import threading
+import warnings
+import weakref
+from concurrent.futures import Executor, ThreadPoolExecutor
 from ._webview_ffi import _webview_lib, _encode_c_string
+from .codec import Codec, resolve_codec, revive_binary, encode_binary_payload
+from ._replies import _ReplyCoalescer
+from ._streams import _Stream, STREAM_KEY
+from ._executor import _OffloadTracker
+from ._asyncio_guest import _AsyncioGuest
+from ._limits import _Limiter
+from ._stats import _BindingStats, now_ns
+from ._trace import _Tracer
+from ._telemetry import _TelemetryBuffer
+from ._profile import _Profiler
+from ._watchdog import _StallWatchdog
+from ._server import _AssetServer
+from ._init_scripts import _InitScripts
+from .assets import AssetRegistry
+from . import _js
+
+_BATCH_BINDING = "__webview_batch_call__"
+_CANCEL_BINDING = "__webview_cancel__"
+# Trailing argument added by __webview_bridge__.call() for cancellable calls.
+_CALL_KEY = "__call__"
+_STREAM_NEXT_BINDING = "__webview_stream_next__"
+_STREAM_CLOSE_BINDING = "__webview_stream_close__"
+_TRACE_BINDING = "__webview_trace__"
+_TELEMETRY_BINDING = "__webview_telemetry__"
+_DATA_URL_PREFIX = "data:text/html;charset=utf-8;base64,"
+# The bridge's own init scripts run before those of the app.
+_INTERNAL_PRIORITY = -1000
+
+# Every Webview alive in the process, to count the ones never destroyed.
+_instances = weakref.WeakSet()
 
 class SizeHint(IntEnum):
     NONE = 0
@@ -18,10 +53,108 @@ class Size:
         self.height = height
         self.hint = hint
 
+class _Binding:
+    def __init__(self, name: str, callback: Callable[..., Any], codec: Codec, executor: Optional[Executor] = None,
+                 limiter: Optional[_Limiter] = None):
+        self.name = name
+        self.callback = callback
+        self.codec = codec
+        self.executor = executor
+        self.limiter = limiter
+        self.stats = _BindingStats()
+        self.profiler = None
+        self.profiling = False
+        self.is_async = inspect.iscoroutinefunction(callback)
+        self.is_stream = inspect.isgeneratorfunction(callback) or inspect.isasyncgenfunction(callback)
+
+    def invoke(self, args: list):
+        """Call the callback, under the profiler while profiling is on."""
+        if not self.profiling:
+            return self.callback(*args)
+        if self.is_async:
+            return self.profiler.call_async(self.callback(*args))
+        return self.profiler.call(self.callback, args)
+
+class _InflightCall:
+    """An async or executor-backed call that can still be cancelled."""
+
+    def __init__(self, key: Any, done: Callable[[bool, Any], None]):
+        self.key = key
+        self.done = done
+        self.task = None
+        self.timer = None
+        self.timeout = None
+        self.reason = None
+        self.reply = True
+        self.limiter = None
+        # Size of the request, kept alive with the arguments until the reply.
+        self.size = 0
+        self._released = False
+
+    def release(self):
+        """Give the concurrency slot of a started call back, once."""
+        if self.limiter is not None and self.task is not None and not self._released:
+            self._released = True
+            self.limiter.release()
+
+    def cancel(self, reason: str, reply: bool = True) -> bool:
+        """Cancel the call; returns True if it ended here rather than in its task."""
+        if self.reason is not None:
+            return False
+        self.reason = reason
+        self.reply = reply
+        if self.timer is not None:
+            self.timer.cancel()
+        if self.task is None:
+            # Still waiting for a concurrency slot.
+            if self.limiter is not None:
+                self.limiter.discard(self)
+            if reply:
+                self.done(False, reason)
+            return True
+        if isinstance(self.task, asyncio.Task):
+            # The task replies (or not) from its CancelledError handler.
+            self.task.cancel()
+            return False
+        if self.task.cancel():
+            # An executor call that had not started yet.
+            self.release()
+            if reply:
+                self.done(False, reason)
+            return True
+        return False
+
 class Webview:
-    def __init__(self, debug: bool = False, size: Optional[Size] = None, window: Optional[int] = None):
+    def __init__(self, debug: bool = False, size: Optional[Size] = None, window: Optional[int] = None,
+                 codec: Union[None, str, Codec, Any] = None):
+        # Resolved first: a bad codec must not leave a native window behind.
+        self.codec = resolve_codec(codec)
         self._handle = _webview_lib.webview_create(int(debug), window)
         self._callbacks = {}
+        self._bindings = {}
+        self._batching = False
+        self._bridge_installed = False
+        self._coalescer = None
+        self._streams = {}
+        self._next_stream_id = 0
+        self._dispatched = []
+        self._dispatch_lock = threading.Lock()
+        self._dispatch_pending = False
+        self._dispatch_callback = _webview_lib.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p)(self._run_dispatched)
+        self._default_executor = None
+        self._offload = _OffloadTracker()
+        self._guest = None
+        self._serving = []
+        self._inflight = {}
+        self._batch_stats = _BindingStats()
+        self._tracer = None
+        self._trace_script_installed = False
+        self._telemetry = None
+        self._watchdog = None
+        self._servers = []
+        self._init_scripts = _InitScripts()
+        self._running = False
+        _instances.add(self)
 
         if size:
             self.size = size
@@ -44,63 +177,907 @@ class Webview:
         _webview_lib.webview_set_title(self._handle, _encode_c_string(value))
         self._title = value
 
+    def __del__(self):
+        # Native resources can only be released on the UI thread, so a
+        # collected instance that still has them is reported, not cleaned up.
+        # ResourceWarning is shown in development mode (python -X dev).
+        if getattr(self, "_handle", None) is not None:
+            warnings.warn(f"Webview was garbage-collected without destroy(), leaking the native window, "
+                          f"{len(self._callbacks)} callback trampolines and {len(self._inflight)} pending calls",
+                          ResourceWarning, source=self)
+
+    def memory_report(self) -> dict:
+        """What the bridge keeps alive for this window, and undestroyed windows.
+
+        Returns:
+            dict: ``trampolines`` (native callbacks with the closures they
+            capture), ``bindings``, ``pending_requests`` and
+            ``inflight_bytes`` (async or executor calls and the size of their
+            requests), ``open_streams``, ``pending_replies`` and
+            ``pending_reply_bytes`` (held back by return coalescing),
+            ``dispatch_queue`` and ``undestroyed_webviews`` in the process.
+        """
+        inflight = list(self._inflight.values())
+        coalescer = self._coalescer
+        return {
+            # One per binding plus the dispatch trampoline.
+            "trampolines": len(self._callbacks) + 1,
+            "bindings": len(self._bindings),
+            "pending_requests": len(inflight),
+            "inflight_bytes": sum(call.size for call in inflight),
+            "open_streams": len(self._streams),
+            "pending_replies": len(coalescer) if coalescer is not None else 0,
+            "pending_reply_bytes": coalescer.pending_bytes() if coalescer is not None else 0,
+            "dispatch_queue": len(self._dispatched),
+            "undestroyed_webviews": sum(1 for webview in list(_instances) if webview._handle is not None),
+        }
+
     def destroy(self):
+        if self._handle is None:
+            # Already destroyed, e.g. from a callback before run() returned.
+            return
+        tracer = self._tracer
+        start = now_ns()
+        self.flush_returns()
+        self._cancel_inflight(reply=False)
+        self._close_streams()
         for name in list(self._callbacks.keys()):
             self.unbind(name)
-        _webview_lib.webview_terminate(self._handle)
-        _webview_lib.webview_destroy(self._handle)
-        self._handle = None
+        if self._default_executor is not None:
+            self._default_executor.shutdown(wait=False)
+            self._default_executor = None
+        if self._watchdog is not None:
+            # Its summary stays available from stats().
+            self._watchdog.stop()
+        for server in self._servers:
+            server.stop()
+        self._servers.clear()
+        # Cleared under the dispatch lock, so no dispatch() from another
+        # thread can pass the handle to native code once it is freed.
+        with self._dispatch_lock:
+            handle, self._handle = self._handle, None
+            self._dispatched.clear()
+        _webview_lib.webview_terminate(handle)
+        _webview_lib.webview_destroy(handle)
+        if tracer is not None:
+            tracer.complete("destroy", "webview", start)
 
     def navigate(self, url: str):
+        self._leave_page()
+        tracer = self._tracer
+        start = now_ns()
         _webview_lib.webview_navigate(self._handle, _encode_c_string(url))
+        if tracer is not None:
+            tracer.complete("navigate", "webview", start, args={"url": url[:200]})
+
+    def set_html(self, html: str):
+        """Load ``html`` as the page, without building a ``data:`` URL.
+
+        Uses ``webview_set_html`` when the loaded library has it.  Otherwise
+        it navigates to a base64 ``data:`` URL, which is a third larger than
+        the UTF-8 document, where percent-encoding can triple it.
+        """
+        set_html = _webview_lib.webview_set_html
+        if set_html is None:
+            self.navigate(_DATA_URL_PREFIX + base64.b64encode(html.encode("utf-8")).decode("ascii"))
+            return
+        self._leave_page()
+        tracer = self._tracer
+        start = now_ns()
+        set_html(self._handle, _encode_c_string(html))
+        if tracer is not None:
+            tracer.complete("set_html", "webview", start, args={"chars": len(html)})
+
+    def serve_directory(self, path: str, port: int = 0, index: str = "index.html", spa: bool = False,
+                        compress: bool = True) -> str:
+        """Serve ``path`` over loopback HTTP and navigate to it.
+
+        Unlike ``file://`` URLs, this lets the page use ES modules,
+        ``fetch()`` and the HTTP cache.  The server runs on background
+        threads until ``destroy()``.
+
+        Args:
+            path: Directory to serve.
+            port: Port on ``127.0.0.1``; 0 picks a free one.
+            index: File served for directory URLs.
+            spa: Serve ``index`` for unknown paths without a file extension,
+                for apps that route on the client.
+            compress: Serve gzip/brotli variants of text assets, compressed
+                once in the background and cached on disk by content hash.
+
+        Returns:
+            str: The URL the window was navigated to.
+        """
+        return self._serve(path, port, index, spa, compress)
+
+    def serve_assets(self, assets: AssetRegistry, port: int = 0, index: str = "index.html",
+                     spa: bool = False, compress: bool = True) -> str:
+        """Serve an ``AssetRegistry`` from memory over loopback HTTP and navigate to it.
+
+        Assets are served with no disk I/O.  Their content-hash URLs (see
+        ``AssetRegistry.url()``) are cached as immutable, and their own paths
+        are revalidated by content hash.  Assets added later are served too.
+
+        Args:
+            assets: The app's files.
+            port: Port on ``127.0.0.1``; 0 picks a free one.
+            index: Asset served for directory URLs.
+            spa: Serve ``index`` for unknown paths without a file extension.
+            compress: Serve gzip/brotli variants, as for ``serve_directory()``.
+
+        Returns:
+            str: The URL the window was navigated to.
+        """
+        return self._serve(assets, port, index, spa, compress)
+
+    def _serve(self, source, port: int, index: str, spa: bool, compress: bool) -> str:
+        server = _AssetServer(source, port, index=index, spa=spa, compress=compress)
+        server.start()
+        self._servers.append(server)
+        self.navigate(server.url)
+        return server.url
+
+    def _leave_page(self):
+        # Nobody on the next page waits for these anymore.
+        self._cancel_inflight(reply=False)
+        self._close_streams()
+        self._flush_init_scripts()
 
     def run(self):
-        _webview_lib.webview_run(self._handle)
+        self._run_native()
         self.destroy()
 
-    def bind(self, name: str, callback: Callable[..., Any]):
+    def _run_native(self):
+        # Pages may now load at any time, without going through navigate().
+        self._flush_init_scripts()
+        self._running = True
+        start = now_ns()
+        try:
+            _webview_lib.webview_run(self._handle)
+        finally:
+            self._running = False
+        if self._tracer is not None:
+            self._tracer.complete("run", "webview", start)
+
+    def terminate(self):
+        """Stop the main loop so that ``run()`` returns; call on the UI thread."""
+        if self._handle is not None:
+            _webview_lib.webview_terminate(self._handle)
+
+    def run_async(self, main: Optional[Awaitable] = None) -> Any:
+        """Run the window with an asyncio event loop driven alongside it.
+
+        Coroutine bindings, ``asyncio`` tasks and timers make progress while
+        the native loop owns the thread; the loop only wakes up for I/O and
+        due timers, so it is free when idle.  If ``main`` is given it runs as
+        a task, the window closes when it finishes and its result is
+        returned (its exception raised).  ``await webview.serve()`` inside
+        ``main`` waits for the user to close the window.
+        """
+        guest = _AsyncioGuest(self.dispatch)
+        loop = guest.loop
+        task = None
+        if main is not None:
+            task = loop.create_task(main)
+            task.add_done_callback(lambda _: self.terminate())
+        self._guest = guest
+        try:
+            guest.start()
+            self._run_native()
+        finally:
+            guest.stop()
+            self._guest = None
+            try:
+                # Let main finish if it is waiting in serve(); anything else
+                # still pending is cancelled by close().
+                serving, self._serving = self._serving, []
+                for waiter in serving:
+                    if not waiter.done():
+                        waiter.set_result(None)
+                if serving and task is not None and not task.done():
+                    loop.run_until_complete(asyncio.wait([task]))
+                self._cancel_inflight(reply=False)
+            finally:
+                guest.close()
+                self.destroy()
+        if task is not None and not task.cancelled():
+            return task.result()
+        return None
+
+    async def serve(self):
+        """Wait until the window is closed; use from ``run_async(main)``."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._serving.append(waiter)
+        await waiter
+
+    def bind(self, name: str, callback: Callable[..., Any], codec: Union[None, str, Codec, Any] = None,
+             executor: Union[None, bool, Executor] = None, max_concurrency: Optional[int] = None,
+             max_queue: Optional[int] = None, overflow: str = "reject", profile: bool = False):
+        """Expose ``callback`` to the page as ``window[name]``.
+
+        Args:
+            name: Name of the JavaScript function.
+            callback: Plain, coroutine, generator or async generator function.
+            codec: Codec for this binding, defaults to the ``Webview`` codec.
+            executor: Run a plain ``callback`` on this executor, or on a
+                built-in thread pool when ``True``, instead of on the UI thread.
+                The reply is sent back from the UI thread.
+            max_concurrency: Maximum number of async or executor calls of this
+                binding in flight at once; further calls are queued.
+            max_queue: Maximum number of queued calls, unlimited by default.
+            overflow: What to do with a call when the queue is full:
+                ``"reject"`` it, ``"drop_oldest"`` queued call, or ``"wait"``
+                in an unbounded queue, which rules out ``max_queue``.  Shed
+                calls reject in the page with
+                ``{code: "overloaded", binding, message}``.
+            profile: Run every call under ``cProfile``; see ``set_profiling()``.
+        """
+        if executor is True:
+            executor = self._get_default_executor()
+        elif executor is False:
+            executor = None
+        limiter = None
+        if max_concurrency is not None or max_queue is not None:
+            limiter = _Limiter(name, max_concurrency, max_queue, overflow)
+        binding = _Binding(name, callback, self.codec if codec is None else resolve_codec(codec), executor, limiter)
+        if executor is not None and (binding.is_async or binding.is_stream):
+            raise ValueError("executor= is only supported for plain (non-async, non-generator) callbacks")
+        if limiter is not None and not (binding.is_async or executor is not None):
+            raise ValueError("max_concurrency/max_queue need an async callback or an executor")
+        if profile and binding.is_stream:
+            raise ValueError("profile= is not supported for generator callbacks")
+        if profile:
+            binding.profiler = _Profiler()
+            binding.profiling = True
+        self._bindings[name] = binding
+        self._install_bridge()
+        if binding.is_stream:
+            self._install_streams()
+        if self._batching:
+            self._define_batched(name)
+        else:
+            self._bind_native(binding)
+
+    def _bind_native(self, binding: _Binding):
+        stats = binding.stats
+
         def wrapper(seq: bytes, req: bytes, arg: int):
-            args = json.loads(req.decode())
-            seq_str = seq.decode()
-            
-            if inspect.iscoroutinefunction(callback):
-                # Handle async function
-                async def handle_async():
-                    try:
-                        result = await callback(*args)
-                        success = True
-                    except Exception as e:
-                        result = str(e)
-                        success = False
-                    self.return_(seq_str, 0 if success else 1, json.dumps(result))                        
-                # Schedule the coroutine to run
-                asyncio.ensure_future(handle_async())
-            else:
+            start = now_ns()
+            args = revive_binary(req, binding.codec.loads(req))
+            decoded = now_ns()
+            stats.decode.record(decoded - start)
+            inline = True
+
+            def done(success: bool, result: Any):
+                finished = now_ns()
+                stats.record_callback(finished - decoded, success)
+                status, payload = self._encode_reply(binding, success, result)
+                encoded = now_ns()
+                stats.encode.record(encoded - finished)
+                self._return(seq, status, payload)
+                returned = now_ns()
+                stats.return_.record(returned - encoded)
+                if self._tracer is not None and not inline:
+                    # Finished after the native callback returned.
+                    self._tracer.async_span(binding.name, "bind.async", seq.decode(), start, returned,
+                                            {"success": success})
+
+            self._invoke(binding, args, done, len(req))
+            inline = False
+
+        self._bind_c_callback(binding.name, wrapper)
+
+    def _bind_c_callback(self, name: str, wrapper: Callable[[bytes, bytes, int], None]):
+        def entry(seq: bytes, req: bytes, arg: int):
+            tracer = self._tracer
+            start = now_ns() if tracer is not None else 0
+            watchdog = self._watchdog
+            call = watchdog.begin(name) if watchdog is not None else None
+            try:
+                wrapper(seq, req, arg)
+            finally:
+                if watchdog is not None:
+                    watchdog.end(call)
+                # The call may have scheduled asyncio work from outside the
+                # loop; interrupt a blocking poll so it runs right away.
+                if self._guest is not None:
+                    self._guest.wake()
+                if tracer is not None:
+                    tracer.complete(name, "bind", start, args={"seq": seq.decode(), "bytes": len(req)})
+
+        c_callback = _webview_lib.CFUNCTYPE(None, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_void_p)(entry)
+        self._callbacks[name] = c_callback
+        _webview_lib.webview_bind(self._handle, _encode_c_string(name), c_callback, None)
+
+    def _invoke(self, binding: _Binding, args: list, done: Callable[[bool, Any], None], size: int = 0):
+        """Run a bound callback and report ``(success, result)`` to ``done``."""
+        options = None
+        if args and isinstance(args[-1], dict) and _CALL_KEY in args[-1]:
+            options = args.pop()
+        if binding.is_stream:
+            try:
+                iterator = binding.callback(*args)
+            except Exception as e:
+                done(False, e)
+                return
+            self._next_stream_id += 1
+            self._streams[self._next_stream_id] = _Stream(self._next_stream_id, binding, iterator)
+            done(True, {STREAM_KEY: self._next_stream_id})
+        elif binding.executor is not None or binding.is_async:
+            if binding.is_async:
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    done(False, RuntimeError(f"{binding.name} is async, run the window with Webview.run_async()"))
+                    return
+            call = self._track(options, done)
+            call.size = size
+            if binding.limiter is None:
+                self._start(binding, args, call)
+                return
+            call.limiter = binding.limiter
+
+            def start():
+                if call.reason is None:
+                    self._start(binding, args, call)
+                else:
+                    binding.limiter.release()
+
+            def reject(error: dict):
+                self._untrack(call)
+                done(False, error)
+
+            binding.limiter.submit(call, start, reject)
+        else:
+            try:
+                result = binding.invoke(args)
+                success = True
+            except Exception as e:
+                result = e
+                success = False
+            done(success, result)
+
+    def _start(self, binding: _Binding, args: list, call: _InflightCall):
+        if binding.executor is not None:
+            def run():
                 try:
-                    result = callback(*args)
+                    result = binding.invoke(args)
                     success = True
                 except Exception as e:
-                    result = str(e)
+                    result = e
                     success = False
-                self.return_(seq_str, 0 if success else 1, json.dumps(result))
 
-        c_callback = _webview_lib.CFUNCTYPE(None, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_void_p)(wrapper)
-        self._callbacks[name] = c_callback
-        _webview_lib.webview_bind(self._handle, _encode_c_string(name), c_callback, None)
+                def reply():
+                    self._untrack(call)
+                    if call.reason is None or call.reply:
+                        call.done(success, result)
+                self.dispatch(reply)
+            call.task = self._offload.submit(binding.executor, run)
+            return
+
+        # Handle async function
+        started = False
+
+        async def handle_async():
+            nonlocal started
+            started = True
+            try:
+                result = await binding.invoke(args)
+                success = True
+            except asyncio.CancelledError:
+                if call.reply:
+                    call.done(False, call.reason or "cancelled")
+                raise
+            except Exception as e:
+                result = e
+                success = False
+            finally:
+                self._untrack(call)
+            call.done(success, result)
+        # Schedule the coroutine to run
+        loop = asyncio.get_running_loop()
+        call.task = loop.create_task(handle_async())
+
+        def cancelled_before_start(task: asyncio.Task):
+            # Cancelled in the loop turn it was created in: the body, and with
+            # it the reply and the cleanup, never ran.
+            if not started:
+                self._untrack(call)
+                if call.reply:
+                    call.done(False, call.reason or "cancelled")
+        call.task.add_done_callback(cancelled_before_start)
+        if call.timeout:
+            call.timer = loop.call_later(call.timeout / 1000, call.cancel,
+                                         f"{binding.name} timed out after {call.timeout} ms")
+
+    def enable_stall_detection(self, budget_ms: float = 16.0, severe_ms: float = 250.0,
+                               on_stall: Optional[Callable[[dict], None]] = None):
+        """Report callbacks that hold the UI thread longer than ``budget_ms``.
+
+        Each native callback and each round of dispatched work (which
+        includes the steps of async bindings under ``run_async()``) is timed.
+        Calls over budget are logged and passed to ``on_stall`` on the UI
+        thread as ``{binding, duration_ms, ts, severe, stack}``; ``stack`` is
+        the Python stack captured while a call was still running past
+        ``severe_ms``.  A summary is reported under ``stats()["stalls"]``.
+        """
+        if self._watchdog is not None:
+            self._watchdog.stop()
+        self._watchdog = _StallWatchdog(budget_ms, severe_ms, on_stall)
+
+    def set_profiling(self, name: str, enabled: bool = True):
+        """Start or pause profiling calls of binding ``name`` at runtime.
+
+        Stats add up across calls, and across pauses, until
+        ``dump_profile(..., reset=True)``.  Only one profiled call is
+        measured at a time; calls overlapping it on other threads are counted
+        as ``skipped`` in ``profile_stats()``.
+        """
+        binding = self._bindings[name]
+        if binding.is_stream:
+            raise ValueError("profiling is not supported for generator callbacks")
+        if enabled and binding.profiler is None:
+            binding.profiler = _Profiler()
+        binding.profiling = enabled
+
+    def profile_stats(self, name: str) -> dict:
+        """Profiled and skipped call counts of binding ``name``, with its ``pstats.Stats``.
+
+        Never blocks: while a profiled call is running, including from inside
+        one, ``stats`` holds the last stats that could be read and ``stale``
+        is True.  ``dump_profile()`` behaves the same way.
+        """
+        profiler = self._bindings[name].profiler
+        if profiler is None:
+            raise ValueError(f"{name} has not been profiled")
+        stats = profiler.stats()
+        return {"calls": profiler.calls, "skipped": profiler.skipped, "stats": stats, "stale": profiler.stale}
+
+    def dump_profile(self, name: str, path: str, format: str = "pstats", reset: bool = False):
+        """Write the profile of binding ``name`` collected so far.
+
+        Args:
+            name: The profiled binding.
+            path: File to write.
+            format: ``"pstats"`` for ``pstats``/snakeviz, or ``"collapsed"``
+                for collapsed stacks (``flamegraph.pl``, speedscope).
+            reset: Start a fresh profile afterwards.
+        """
+        profiler = self._bindings[name].profiler
+        if profiler is None:
+            raise ValueError(f"{name} has not been profiled")
+        profiler.dump(path, format)
+        if reset:
+            profiler.reset()
+
+    def stats(self) -> dict:
+        """Bridge statistics since creation or the last ``reset_stats()``.
+
+        ``bindings`` maps every binding to its call and error counts and to
+        latency summaries (count, mean, p50/p95/p99, max, in milliseconds) of
+        the decode, callback, encode and ``webview_return`` phases.  The
+        callback phase of async and executor calls includes time spent
+        queued.  Batched calls share one decode/return, reported under
+        ``batch``.  ``telemetry`` counts the batches and records received by
+        ``enable_telemetry()``, and ``stalls`` summarizes the UI thread stalls
+        found by ``enable_stall_detection()``.
+        """
+        return {
+            "bindings": {name: binding.stats.summary() for name, binding in self._bindings.items()},
+            "batch": self._batch_stats.summary() if self._batching else None,
+            "executor": self.executor_stats(),
+            "concurrency": self.concurrency_stats(),
+            "telemetry": self._telemetry.stats() if self._telemetry is not None else None,
+            "stalls": self._watchdog.summary() if self._watchdog is not None else None,
+        }
+
+    def reset_stats(self):
+        """Clear the latency histograms and counters reported by ``stats()``."""
+        for binding in self._bindings.values():
+            binding.stats.reset()
+        self._batch_stats.reset()
+
+    def concurrency_stats(self) -> dict:
+        """Queued, running, rejected and dropped calls of limited bindings."""
+        return {name: binding.limiter.stats() for name, binding in self._bindings.items()
+                if binding.limiter is not None}
+
+    def _track(self, options: Optional[dict], done: Callable[[bool, Any], None]) -> _InflightCall:
+        call = _InflightCall(None, done)
+        call.key = options[_CALL_KEY] if options else call
+        call.timeout = options.get("timeout") if options else None
+        self._inflight[call.key] = call
+        return call
+
+    def _untrack(self, call: _InflightCall):
+        if self._inflight.get(call.key) is call:
+            del self._inflight[call.key]
+        if call.timer is not None:
+            call.timer.cancel()
+        # Hand the slot to the next queued call once this one ends.
+        call.release()
+
+    def _cancel_inflight(self, reply: bool = True):
+        for call in list(self._inflight.values()):
+            call.cancel("cancelled", reply)
+        self._inflight.clear()
+
+    def _on_cancel(self, seq: bytes, req: bytes, arg: int):
+        call = self._inflight.get(self.codec.loads(req)[0])
+        if call is not None and call.cancel("cancelled by caller"):
+            self._untrack(call)
+        self._return(seq, 0, b"null")
+
+    def _get_default_executor(self) -> Executor:
+        if self._default_executor is None:
+            self._default_executor = ThreadPoolExecutor(thread_name_prefix="webview-bind")
+        return self._default_executor
+
+    def executor_stats(self) -> dict:
+        """Queue depth and worker utilization of executor-backed bindings."""
+        return self._offload.stats()
+
+    def dispatch(self, fn: Callable[[], None]):
+        """Run ``fn`` on the thread running the window; safe from any thread.
+
+        Use it from worker threads to call ``eval``, ``return_``, ``navigate``
+        and friends.  Closures queue up on the Python side and at most one
+        native ``webview_dispatch`` is outstanding at a time, so thousands of
+        updates per second cost a fixed number of UI thread wakeups.
+        """
+        with self._dispatch_lock:
+            handle = self._handle
+            if handle is None:
+                return
+            self._dispatched.append(fn)
+            if self._dispatch_pending:
+                return
+            self._dispatch_pending = True
+            # Posted under the lock, so that destroy() cannot free the window
+            # in between; webview_dispatch only queues and returns.
+            _webview_lib.webview_dispatch(handle, self._dispatch_callback, None)
+
+    def _run_dispatched(self, handle: int, arg: int):
+        tracer = self._tracer
+        start = now_ns() if tracer is not None else 0
+        watchdog = self._watchdog
+        call = watchdog.begin("dispatch") if watchdog is not None else None
+        with self._dispatch_lock:
+            batch, self._dispatched = self._dispatched, []
+        for fn in batch:
+            try:
+                fn()
+            except Exception:
+                logging.exception("webview: dispatched callback failed")
+            if self._handle is None:
+                # A closure destroyed the window; the rest have nothing to act on.
+                break
+        if self._guest is not None:
+            # Closures may have scheduled asyncio work (call_soon, create_task)
+            # that a poll blocked since before they ran would not see.
+            self._guest.wake_if_needed()
+        if watchdog is not None:
+            watchdog.end(call)
+        if tracer is not None:
+            tracer.complete("dispatch", "webview", start, args={"callbacks": len(batch)})
+        with self._dispatch_lock:
+            if not self._dispatched or self._handle is None:
+                self._dispatch_pending = False
+                return
+            # More work arrived while draining; let the UI handle its own
+            # events before the next round instead of looping here.
+            _webview_lib.webview_dispatch(self._handle, self._dispatch_callback, None)
+
+    def _install_bridge(self):
+        if not self._bridge_installed:
+            self._bridge_installed = True
+            self._add_internal_script("webview:bridge", _js.BRIDGE_SCRIPT)
+            self._bind_c_callback(_CANCEL_BINDING, self._on_cancel)
+
+    def _install_streams(self):
+        if _STREAM_NEXT_BINDING not in self._callbacks:
+            self._bind_c_callback(_STREAM_NEXT_BINDING, self._on_stream_next)
+            self._bind_c_callback(_STREAM_CLOSE_BINDING, self._on_stream_close)
+
+    def _on_stream_next(self, seq: bytes, req: bytes, arg: int):
+        stream = self._streams.get(self.codec.loads(req)[0])
+        if stream is None:
+            self._return(seq, 1, self.codec.dumps("stream is closed"))
+            return
+
+        def done(success: bool, result: Any):
+            if not success or result[0]:
+                self._streams.pop(stream.id, None)
+            status, payload = self._encode_reply(stream.binding, success, result)
+            self._return(seq, status, payload)
+
+        stream.pull(done)
+
+    def _on_stream_close(self, seq: bytes, req: bytes, arg: int):
+        stream = self._streams.pop(self.codec.loads(req)[0], None)
+        if stream is not None:
+            stream.close()
+        self._return(seq, 0, b"null")
+
+    def _close_streams(self, binding: Optional[_Binding] = None):
+        for stream in list(self._streams.values()):
+            if binding is None or stream.binding is binding:
+                del self._streams[stream.id]
+                stream.close()
+
+    def _encode_reply(self, binding: _Binding, success: bool, result: Any):
+        codec = binding.codec
+        if success and isinstance(result, (bytes, bytearray, memoryview)):
+            return 0, encode_binary_payload(result)
+        try:
+            # Failures reach the page as a message, or as is when structured.
+            payload = codec.dumps(result if success or isinstance(result, dict) else str(result))
+        except Exception as e:
+            success = False
+            payload = codec.dumps(str(e))
+        return 0 if success else 1, payload
+
+    def enable_batching(self):
+        """Route calls made during one JS microtask through a single native call.
+
+        Every binding, including those bound later, is replaced in the page by
+        a stub that queues the call.  The queue is flushed once per microtask
+        into one ``webview_bind`` invocation; Python runs the whole batch and
+        resolves all of its promises with one ``webview_return``.  A batch
+        that contains async bindings is answered once all of them finish.
+        """
+        if self._batching:
+            return
+        self._batching = True
+        self._install_bridge()
+        self._add_internal_script("webview:batch", _js.BATCH_SCRIPT)
+        self._bind_c_callback(_BATCH_BINDING, self._on_batch)
+        for name in self._bindings:
+            if name in self._callbacks:
+                _webview_lib.webview_unbind(self._handle, _encode_c_string(name))
+                del self._callbacks[name]
+            self._define_batched(name)
+
+    def _define_batched(self, name: str):
+        self._add_internal_script(f"webview:batch:{name}", f"window.__webview_batch__.define({_js.quote(name)})")
+
+    def _on_batch(self, seq: bytes, req: bytes, arg: int):
+        # Decoding and returning happen once per batch and are accounted to
+        # the batch itself, callback and encode times to each binding.
+        start = now_ns()
+        calls = revive_binary(req, self.codec.loads(req))[0]
+        decoded = now_ns()
+        self._batch_stats.decode.record(decoded - start)
+        replies = [None] * len(calls)
+        remaining = len(calls)
+
+        def complete(index: int, status: int, payload: bytes):
+            nonlocal remaining
+            replies[index] = b"[%d,%s]" % (status, payload)
+            remaining -= 1
+            if remaining == 0:
+                finished = now_ns()
+                self._batch_stats.record_callback(finished - decoded, True)
+                self._return(seq, 0, b"[" + b",".join(replies) + b"]")
+                self._batch_stats.return_.record(now_ns() - finished)
+
+        def reply(binding: _Binding, index: int, success: bool, result: Any):
+            finished = now_ns()
+            binding.stats.record_callback(finished - decoded, success)
+            status, payload = self._encode_reply(binding, success, result)
+            binding.stats.encode.record(now_ns() - finished)
+            complete(index, status, payload)
+
+        if not calls:
+            self._return(seq, 0, b"[]")
+        for index, (name, args) in enumerate(calls):
+            binding = self._bindings.get(name)
+            if binding is None:
+                complete(index, 1, self.codec.dumps(f"{name} is not bound"))
+                continue
+            self._invoke(binding, args,
+                         lambda success, result, index=index, binding=binding: reply(binding, index, success, result),
+                         len(req) // len(calls))
 
     def unbind(self, name: str):
+        binding = self._bindings.pop(name, None)
+        if binding is not None and binding.is_stream:
+            self._close_streams(binding)
         if name in self._callbacks:
             _webview_lib.webview_unbind(self._handle, _encode_c_string(name))
             del self._callbacks[name]
+        elif self._batching:
+            self._init_scripts.discard(f"webview:batch:{name}")
+            self.eval(f"delete window[{_js.quote(name)}]")
+
+    def return_(self, seq: Union[str, bytes], status: int, result: Union[str, bytes]):
+        if isinstance(seq, str):
+            seq = _encode_c_string(seq)
+        if isinstance(result, str):
+            result = _encode_c_string(result)
+        self._return(seq, status, result)
+
+    def _return(self, seq: bytes, status: int, result: bytes):
+        # seq and result are already encoded, they go to the native side as is.
+        tracer = self._tracer
+        start = now_ns() if tracer is not None else 0
+        if self._coalescer is not None:
+            self._coalescer.add(seq, status, result)
+        else:
+            _webview_lib.webview_return(self._handle, seq, status, result)
+        if tracer is not None:
+            tracer.complete("return", "return", start, args={"seq": seq.decode(), "bytes": len(result)})
+
+    def enable_return_coalescing(self, max_pending: int = 64):
+        """Resolve replies that complete together with one native call.
 
-    def return_(self, seq: str, status: int, result: str):
-        _webview_lib.webview_return(self._handle, _encode_c_string(seq), status, _encode_c_string(result))
+        Replies are collected and flushed once per asyncio loop iteration
+        when one is running, otherwise once per native loop iteration through
+        ``dispatch``, or as soon as ``max_pending`` of them are waiting.  All
+        of the matching promises are resolved in one eval.
+        """
+        if self._coalescer is None:
+            self._coalescer = _ReplyCoalescer(
+                lambda seq, status, result: _webview_lib.webview_return(self._handle, seq, status, result),
+                lambda source: _webview_lib.webview_eval(self._handle, source),
+                max_pending, self.dispatch)
+        else:
+            self._coalescer.max_pending = max_pending
+
+    def flush_returns(self):
+        """Resolve every reply still held back by return coalescing."""
+        if self._coalescer is not None:
+            self._coalescer.flush()
 
     def eval(self, source: str):
+        tracer = self._tracer
+        if tracer is None:
+            _webview_lib.webview_eval(self._handle, _encode_c_string(source))
+            return
+        start = now_ns()
         _webview_lib.webview_eval(self._handle, _encode_c_string(source))
+        tracer.complete("eval", "eval", start, args={"chars": len(source)})
+
+    def start_tracing(self, page: bool = True, max_events: int = 1_000_000):
+        """Record bridge activity as Chrome trace events until ``stop_tracing()``.
+
+        Native callbacks, async and executor calls, returns, evals, dispatched
+        callbacks, navigations, ``run`` and ``destroy`` are recorded with
+        their thread.  With ``page``, ``performance.mark()`` and
+        ``performance.measure()`` entries of the page are sent back in
+        batches and recorded on their own track.
+
+        Args:
+            page: Also collect the page's performance marks and measures.
+            max_events: Keep only this many most recent events.
+        """
+        self._tracer = _Tracer(max_events)
+        if page and _TRACE_BINDING not in self._callbacks:
+            self._bind_c_callback(_TRACE_BINDING, self._on_trace)
+            if not self._trace_script_installed:
+                self._trace_script_installed = True
+                self._add_internal_script("webview:trace", _js.TRACE_SCRIPT)
+
+    def stop_tracing(self, path: Optional[str] = None) -> Optional[dict]:
+        """Stop recording and return the trace, also writing it to ``path`` when given.
+
+        The result is Chrome Trace Event JSON that Perfetto
+        (https://ui.perfetto.dev) and ``chrome://tracing`` open directly.
+        """
+        tracer, self._tracer = self._tracer, None
+        if _TRACE_BINDING in self._callbacks:
+            self.unbind(_TRACE_BINDING)
+        if tracer is None:
+            return None
+        if path is not None:
+            tracer.dump(path)
+        return tracer.to_dict()
+
+    def enable_telemetry(self, interval_ms: int = 5000, capacity: int = 10_000):
+        """Collect frontend performance data from every page.
+
+        An init script records Navigation Timing, first paint and first
+        contentful paint, long tasks and, where the engine supports it, JS
+        heap samples, and sends them every ``interval_ms`` as one compressed
+        batch.  The most recent ``capacity`` records are kept; read them
+        with ``telemetry()``.
+        """
+        if self._telemetry is not None:
+            return
+        self._telemetry = _TelemetryBuffer(capacity)
+        self._bind_c_callback(_TELEMETRY_BINDING, self._on_telemetry)
+        self._add_internal_script("webview:telemetry", f"{_js.TELEMETRY_SCRIPT}({int(interval_ms)});")
+
+    def telemetry(self, type: Optional[str] = None, clear: bool = False) -> list:
+        """Records collected by ``enable_telemetry()``, oldest first.
+
+        Args:
+            type: Only records of this type: ``"navigation"``, ``"paint"``,
+                ``"longtask"`` or ``"memory"``.
+            clear: Empty the buffer after reading it.
+
+        Returns:
+            list: Record dicts with a ``type`` and a ``ts`` (epoch ms).
+        """
+        if self._telemetry is None:
+            return []
+        return self._telemetry.records(type, clear)
+
+    def _on_telemetry(self, seq: bytes, req: bytes, arg: int):
+        try:
+            self._telemetry.add_batch(revive_binary(req, self.codec.loads(req))[0])
+        except Exception:
+            logging.exception("webview: invalid telemetry batch")
+        self._return(seq, 0, b"null")
+
+    def _on_trace(self, seq: bytes, req: bytes, arg: int):
+        if self._tracer is not None:
+            self._tracer.add_page_entries(self.codec.loads(req)[0])
+        self._return(seq, 0, b"null")
 
     def init(self, source: str):
-        _webview_lib.webview_init(self._handle, _encode_c_string(source))
+        """Run ``source`` on every page load, before the page's own scripts.
+
+        Same as ``add_init_script()`` named after the content hash, so
+        adding the same source twice injects it once.
+        """
+        self.add_init_script(None, source)
+
+    def add_init_script(self, name: Optional[str], source: str, priority: int = 0,
+                        minify: Union[bool, Callable[[str], str]] = False) -> bool:
+        """Register a named script to run on every page load.
+
+        Scripts are injected together as one script when the window next
+        navigates or starts running, or right away if it is running.  They
+        run in ``priority`` order, lower first, then in the order they were
+        added; a script with the same content as another one is only
+        injected once.  Adding a script under a name that is still pending
+        replaces it.
+
+        Args:
+            name: Key for replacing or removing the script.
+            source: JavaScript source.
+            priority: Scripts with lower priority run first; the bridge's
+                own scripts use -1000.
+            minify: True to minify with ``rjsmin``, or a ``str -> str``
+                function.  Results are cached by source.
+
+        Returns:
+            bool: False if the same content was already registered.
+
+        Raises:
+            RuntimeError: If ``name`` was already injected with a different
+                source; injected scripts cannot be taken back.
+        """
+        added = self._init_scripts.add(name, source, priority, minify)
+        if self._running:
+            self.dispatch(self._flush_init_scripts)
+        return added
+
+    def remove_init_script(self, name: str):
+        """Unregister a script before it is injected.
+
+        Raises:
+            KeyError: If there is no script called ``name``.
+            RuntimeError: If it was already injected; pages keep running it.
+        """
+        self._init_scripts.remove(name)
+
+    def init_scripts(self) -> list:
+        """Names of the registered init scripts, in the order they run."""
+        return self._init_scripts.names()
+
+    def _add_internal_script(self, name: str, source: str):
+        self._init_scripts.add(name, source, _INTERNAL_PRIORITY)
+        if self._running:
+            self.dispatch(self._flush_init_scripts)
+        # The current page gets it as well.
+        self.eval(source)
+
+    def _flush_init_scripts(self):
+        source = self._init_scripts.take()
+        if source is not None:
+            _webview_lib.webview_init(self._handle, _encode_c_string(source))
 
 if __name__ == "__main__":
     wv = Webview()
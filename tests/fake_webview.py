@@ -0,0 +1,37 @@
+"""Shared fixture for tests that drive a ``Webview`` through the fake backend."""
+import threading
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+from webview._fake_backend import _FakeWebviewLibrary
+from webview.webview import Webview
+
+
+class FakeWebviewTestCase(unittest.TestCase):
+    """Provides ``self.webview`` on a fake backend ``self.lib``, and its page as ``self.page``."""
+
+    def setUp(self):
+        self.lib = _FakeWebviewLibrary(latency=0)
+        patcher = mock.patch("webview.webview._webview_lib", self.lib)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.webview = Webview()
+        # Runs before the patch is undone; a no-op once run() has returned.
+        self.addCleanup(self.webview.destroy)
+        self.page = self.lib.page(self.webview._handle)
+
+    @contextmanager
+    def running(self, timeout=5):
+        """Run the window on a worker thread for the duration of the block, yielding that thread."""
+        thread = threading.Thread(target=self.webview.run)
+        thread.start()
+        try:
+            yield thread
+        finally:
+            self.webview.dispatch(self.webview.terminate)
+            thread.join(timeout)
+
+    def run_until(self, futures, timeout=5):
+        """Run the window until every future is done; returns their results or raises the first error."""
+        with self.running(timeout):
+            return [future.result(timeout) for future in futures]
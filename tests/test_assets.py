@@ -0,0 +1,134 @@
+import http.client
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+from fake_webview import FakeWebviewTestCase
+from webview._server import _AssetServer
+from webview.assets import AssetRegistry
+
+
+class TestAssetRegistry(unittest.TestCase):
+    def test_add_and_hashed_url(self):
+        assets = AssetRegistry()
+        url = assets.add("/js/app.js", "export default 1;")
+        self.assertRegex(url, r"^/js/app\.[0-9a-f]{16}\.js$")
+        self.assertEqual(assets.url("js/app.js"), url)
+        asset, hashed = assets.lookup(url)
+        self.assertTrue(hashed)
+        self.assertEqual(asset.data, b"export default 1;")
+        self.assertEqual(asset.content_type, "text/javascript; charset=utf-8")
+        self.assertEqual(assets.lookup("/js/app.js"), (asset, False))
+        self.assertIn("js/app.js", assets)
+
+    def test_replacing_changes_hash(self):
+        assets = AssetRegistry()
+        old = assets.add("app.css", "a{}")
+        new = assets.add("app.css", "b{}")
+        self.assertNotEqual(old, new)
+        self.assertIsNone(assets.lookup(old))
+        self.assertEqual(len(assets), 1)
+        assets.remove("app.css")
+        self.assertIsNone(assets.lookup(new))
+
+    def test_rejects_bad_paths(self):
+        assets = AssetRegistry()
+        for path in ["", "../secret", "a/../../b", "a//b"]:
+            with self.assertRaises(ValueError):
+                assets.add(path, b"")
+
+    def test_add_zip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "app.zip")
+            with zipfile.ZipFile(path, "w") as archive:
+                archive.writestr("dist/index.html", "<h1>zip</h1>")
+                archive.writestr("dist/fonts/a.woff2", b"wOF2")
+                archive.writestr("README.md", "not served")
+            assets = AssetRegistry()
+            self.assertEqual(assets.add_zip(path, directory="dist", prefix="app"), 2)
+            self.assertEqual(assets.lookup("app/index.html")[0].data, b"<h1>zip</h1>")
+            self.assertEqual(assets.lookup("app/fonts/a.woff2")[0].content_type, "font/woff2")
+            self.assertNotIn("README.md", assets)
+
+    def test_add_resources(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            web = os.path.join(tmp, "asset_pkg", "web")
+            os.makedirs(os.path.join(web, "__pycache__"))
+            for name, data in [("../__init__.py", ""), ("index.html", "<h1>pkg</h1>"),
+                               ("__init__.py", ""), ("__pycache__/x.pyc", "")]:
+                with open(os.path.join(web, name), "w") as f:
+                    f.write(data)
+            sys.path.insert(0, tmp)
+            self.addCleanup(sys.path.remove, tmp)
+            self.addCleanup(sys.modules.pop, "asset_pkg", None)
+            assets = AssetRegistry()
+            self.assertEqual(assets.add_resources("asset_pkg", "web"), 1)
+            self.assertEqual(assets.lookup("index.html")[0].data, b"<h1>pkg</h1>")
+            with self.assertRaises(FileNotFoundError):
+                assets.add_resources("asset_pkg", "missing")
+
+
+class TestMemoryServer(unittest.TestCase):
+    def setUp(self):
+        self.assets = AssetRegistry()
+        self.assets.add("index.html", "<!doctype html><script type=module src=app.js></script>")
+        self.app_url = self.assets.add("app.js", "export default 1;")
+        self.assets.add("docs/index.html", "docs")
+        self.server = _AssetServer(self.assets)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.conn = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+        self.addCleanup(self.conn.close)
+
+    def get(self, path, headers=None):
+        self.conn.request("GET", path, headers=headers or {})
+        response = self.conn.getresponse()
+        return response, response.read()
+
+    def test_hashed_url_is_immutable(self):
+        response, body = self.get(self.app_url)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"export default 1;")
+        self.assertIn("immutable", response.getheader("Cache-Control"))
+        self.assertTrue(response.getheader("Content-Type").startswith("text/javascript"))
+
+    def test_named_path_revalidates_by_hash(self):
+        response, body = self.get("/app.js")
+        self.assertEqual(response.getheader("Cache-Control"), "no-cache")
+        etag = response.getheader("ETag")
+        response, body = self.get("/app.js", {"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+
+    def test_index_redirect_and_missing(self):
+        self.assertIn(b"app.js", self.get("/")[1])
+        response, _ = self.get("/docs")
+        self.assertEqual(response.status, 301)
+        self.assertEqual(response.getheader("Location"), "/docs/")
+        self.assertEqual(self.get("/docs/")[1], b"docs")
+        self.assertEqual(self.get("/missing")[0].status, 404)
+        self.assertEqual(self.get("/app.0000000000000000.js")[0].status, 404)
+
+    def test_serves_assets_added_later(self):
+        url = self.assets.add("late.css", "a{}")
+        self.assertEqual(self.get(url)[1], b"a{}")
+
+
+class TestServeAssets(FakeWebviewTestCase):
+    def test_navigates(self):
+        with tempfile.TemporaryDirectory() as cache, mock.patch.dict(os.environ, WEBVIEW_ASSET_CACHE=cache):
+            assets = AssetRegistry()
+            assets.add("index.html", "hello")
+            url = self.webview.serve_assets(assets)
+            self.assertEqual(self.page.url, url)
+            conn = http.client.HTTPConnection("127.0.0.1", self.webview._servers[0].server_address[1], timeout=5)
+            conn.request("GET", "/")
+            self.assertEqual(conn.getresponse().read(), b"hello")
+            conn.close()
+            self.webview.destroy()
+
+
+if __name__ == '__main__':
+    unittest.main()
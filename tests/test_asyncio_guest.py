@@ -0,0 +1,119 @@
+import asyncio
+import queue
+import threading
+import time
+import unittest
+from fake_webview import FakeWebviewTestCase
+from webview._asyncio_guest import _AsyncioGuest
+
+
+class TestAsyncioGuest(unittest.TestCase):
+    def run_ui_loop(self, guest, main, timeout=5):
+        """Stand in for webview_run: execute dispatched callbacks until main is done."""
+        ui = queue.Queue()
+        guest._dispatch = ui.put
+        task = guest.loop.create_task(main)
+        guest.start()
+        deadline = time.monotonic() + timeout
+        try:
+            while not task.done() and time.monotonic() < deadline:
+                try:
+                    ui.get(timeout=0.05)()
+                except queue.Empty:
+                    pass
+        finally:
+            guest.stop()
+            guest.close()
+        return task.result()
+
+    def test_timers_and_tasks_make_progress(self):
+        async def main():
+            start = time.monotonic()
+            results = await asyncio.gather(asyncio.sleep(0.05, "a"), asyncio.sleep(0.01, "b"))
+            return results, time.monotonic() - start
+
+        results, elapsed = self.run_ui_loop(_AsyncioGuest(None), main())
+        self.assertEqual(results, ["a", "b"])
+        self.assertLess(elapsed, 1)
+
+    def test_idle_loop_does_not_spin(self):
+        guest = _AsyncioGuest(None)
+        processed = 0
+        process = guest._process
+
+        def counting_process(events):
+            nonlocal processed
+            processed += 1
+            process(events)
+
+        guest._process = counting_process
+        self.run_ui_loop(guest, asyncio.sleep(0.3))
+        self.assertLess(processed, 10)
+
+    def test_wake_runs_callbacks_added_from_outside(self):
+        guest = _AsyncioGuest(None)
+
+        def native_callback(future):
+            # Runs on the UI thread between two loop turns, like a bound call.
+            guest.loop.call_soon(future.set_result, "woken")
+            guest.wake()
+
+        async def main():
+            future = guest.loop.create_future()
+            start = time.monotonic()
+            guest._dispatch(lambda: native_callback(future))
+            result = await asyncio.wait_for(future, 2)
+            return result, time.monotonic() - start
+
+        result, elapsed = self.run_ui_loop(guest, main())
+        self.assertEqual(result, "woken")
+        self.assertLess(elapsed, 1)
+
+
+class TestRunAsync(FakeWebviewTestCase):
+    def test_coalesced_executor_reply_is_sent(self):
+        # The reply is queued by a dispatched closure with loop.call_soon().
+        self.webview.enable_return_coalescing()
+
+        def work(x):
+            # Finishes once the poll is blocked with nothing to wait for.
+            time.sleep(0.05)
+            return x * 2
+
+        self.webview.bind("work", work, executor=True)
+        future = self.page.call("work", 21)
+
+        async def main():
+            start = time.monotonic()
+            result = await asyncio.wait_for(asyncio.wrap_future(future), 5)
+            return result, time.monotonic() - start
+
+        result, elapsed = self.webview.run_async(main())
+        self.assertEqual(result, 42)
+        self.assertLess(elapsed, 1)
+
+    def test_task_created_in_dispatched_closure_runs(self):
+        async def main():
+            loop = asyncio.get_running_loop()
+            done = loop.create_future()
+
+            async def job():
+                done.set_result("ran")
+
+            start = time.monotonic()
+            def worker():
+                # Hands work to the loop once the poll is blocked.
+                time.sleep(0.05)
+                self.webview.dispatch(lambda: loop.create_task(job()))
+
+            threading.Thread(target=worker).start()
+            result = await asyncio.wait_for(done, 5)
+            return result, time.monotonic() - start
+
+        result, elapsed = self.webview.run_async(main())
+        self.assertEqual(result, "ran")
+        self.assertLess(elapsed, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
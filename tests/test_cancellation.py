@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+from fake_webview import FakeWebviewTestCase
+from webview._fake_backend import _CallRejected
+from webview.webview import _InflightCall
+
+
+class TestInflightCall(unittest.TestCase):
+    def test_cancels_task_once(self):
+        async def main():
+            call = _InflightCall("page:1", lambda success, result: None)
+            call.task = asyncio.get_running_loop().create_task(asyncio.sleep(10))
+            call.cancel("cancelled by caller")
+            call.cancel("cancelled")
+            with self.assertRaises(asyncio.CancelledError):
+                await call.task
+            return call
+
+        call = asyncio.run(main())
+        self.assertEqual(call.reason, "cancelled by caller")
+        self.assertTrue(call.reply)
+
+    def test_queued_executor_call_replies_on_cancel(self):
+        replies = []
+        call = _InflightCall("page:2", lambda success, result: replies.append((success, result)))
+        call.task = Future()
+        call.cancel("cancelled")
+        self.assertTrue(call.task.cancelled())
+        self.assertEqual(replies, [(False, "cancelled")])
+
+    def test_silent_cancel_does_not_reply(self):
+        replies = []
+        call = _InflightCall("page:3", lambda success, result: replies.append((success, result)))
+        call.task = Future()
+        call.cancel("cancelled", reply=False)
+        self.assertEqual(replies, [])
+
+
+class TestWebviewCancellation(FakeWebviewTestCase):
+    def cancel_queued(self, **bind_options):
+        """Cancel a call queued behind a blocked one; returns the pending counts after the cancel and the end."""
+        release = threading.Event()
+        self.webview.bind("block", lambda: release.wait(5), **bind_options)
+        first = self.page.call("block", {"__call__": "p:1"})
+        second = self.page.call("block", {"__call__": "p:2"})
+        with self.running():
+            self.page.call("__webview_cancel__", "p:2").result(5)
+            cancelled = self.webview.memory_report()["pending_requests"]
+            with self.assertRaises(_CallRejected) as raised:
+                second.result(5)
+            self.assertEqual(raised.exception.value, "cancelled by caller")
+            release.set()
+            # Untracked before the reply is sent.
+            self.assertTrue(first.result(5))
+            finished = self.webview.memory_report()["pending_requests"]
+        return cancelled, finished
+
+    def test_cancelled_before_its_executor_runs_it(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        self.assertEqual(self.cancel_queued(executor=executor), (1, 0))
+
+    def test_cancelled_while_waiting_for_a_slot(self):
+        self.assertEqual(self.cancel_queued(executor=True, max_concurrency=1), (1, 0))
+
+    def test_async_call_cancelled_before_its_first_step(self):
+        async def slow():
+            await asyncio.sleep(0.01)
+            return 1
+
+        self.webview.bind("slow", slow, max_concurrency=1)
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            # Delivered together, so the task is cancelled before it runs.
+            first = self.page.call("slow", {"__call__": "p:1"})
+            self.page.call("__webview_cancel__", "p:1")
+            with self.assertRaises(_CallRejected) as raised:
+                await asyncio.wait_for(asyncio.wrap_future(first, loop=loop), 2)
+            self.assertEqual(raised.exception.value, "cancelled by caller")
+            second = self.page.call("slow", {"__call__": "p:2"})
+            return await asyncio.wait_for(asyncio.wrap_future(second, loop=loop), 2), self.webview.memory_report()
+
+        result, report = self.webview.run_async(main())
+        self.assertEqual((result, report["pending_requests"]), (1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
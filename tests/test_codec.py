@@ -0,0 +1,60 @@
+import json
+import unittest
+from unittest import mock
+from webview._fake_backend import _FakeWebviewLibrary
+from webview.codec import Codec, JsonCodec, resolve_codec, revive_binary, encode_binary_payload
+from webview.webview import Webview
+
+
+class TestCodec(unittest.TestCase):
+    def test_json_round_trip_is_bytes(self):
+        codec = JsonCodec()
+        payload = codec.dumps({"name": "webview", "items": [1, 2.5, None, "中文"]})
+        self.assertIsInstance(payload, bytes)
+        self.assertEqual(codec.loads(payload), {"name": "webview", "items": [1, 2.5, None, "中文"]})
+
+    def test_resolve_default_is_stdlib(self):
+        self.assertIsInstance(resolve_codec(None), JsonCodec)
+        self.assertIsInstance(resolve_codec("json"), JsonCodec)
+
+    def test_resolve_module_like_object(self):
+        codec = resolve_codec(json)
+        self.assertIsInstance(codec, Codec)
+        self.assertEqual(codec.dumps([1, 2]), b"[1, 2]")
+        self.assertEqual(codec.loads(b"[1, 2]"), [1, 2])
+
+    def test_resolve_unknown_name(self):
+        with self.assertRaises(ValueError):
+            resolve_codec("yaml")
+
+    def test_resolve_invalid_object(self):
+        with self.assertRaises(TypeError):
+            resolve_codec(object())
+
+    def test_auto_picks_a_working_codec(self):
+        codec = resolve_codec("auto")
+        self.assertEqual(codec.loads(codec.dumps({"1": [True]})), {"1": [True]})
+
+    def test_binary_results_are_tagged(self):
+        codec = JsonCodec()
+        self.assertEqual(codec.loads(codec.dumps({"png": b"\x89PNG"})), {"png": {"__bytes__": "iVBORw=="}})
+        self.assertEqual(encode_binary_payload(memoryview(b"\x00\xff")), b'{"__bytes__":"AP8="}')
+
+    def test_binary_arguments_are_revived(self):
+        codec = JsonCodec()
+        req = b'[{"__bytes__":"AP8="},{"nested":[{"__bytes__":""}]},"plain"]'
+        self.assertEqual(revive_binary(req, codec.loads(req)), [b"\x00\xff", {"nested": [b""]}, "plain"])
+        req = b'[{"a":1}]'
+        args = codec.loads(req)
+        self.assertIs(revive_binary(req, args), args)
+
+    def test_bad_codec_creates_no_window(self):
+        lib = _FakeWebviewLibrary(latency=0)
+        with mock.patch("webview.webview._webview_lib", lib):
+            with self.assertRaises(ValueError):
+                Webview(codec="ujson")
+        self.assertEqual(lib.pages, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import gzip
+import http.client
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from webview import _compress
+from webview._compress import _VariantCache, accepted_encodings
+from webview._server import _AssetServer
+from webview.assets import AssetRegistry
+
+BUNDLE = b"".join(b"export function f%d(x) { return x + %d; }\n" % (i, i) for i in range(2000))
+
+
+class TestVariantCache(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+        self.cache = _VariantCache(self.directory)
+        self.addCleanup(self.cache.stop)
+
+    def test_compresses_once_in_background(self):
+        self.assertIsNone(self.cache.find("k", BUNDLE, {"gzip"}))
+        self.cache.wait()
+        encoding, path, size = self.cache.find("k", BUNDLE, {"gzip"})
+        self.assertEqual(encoding, "gzip")
+        with open(path, "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()), BUNDLE)
+        self.assertEqual(size, os.path.getsize(path))
+        self.assertIsNone(self.cache.find("k", BUNDLE, {"identity"}))
+
+    def test_cache_survives_restart(self):
+        self.cache.find("k", BUNDLE, {"gzip"})
+        self.cache.wait()
+        path = self.cache.find("k", BUNDLE, {"gzip"})[1]
+        mtime = os.stat(path).st_mtime_ns
+        other = _VariantCache(self.directory)
+        self.addCleanup(other.stop)
+        with mock.patch("gzip.compress") as compress:
+            other.find("k2", BUNDLE, {"gzip"})
+            other.wait()
+            compress.assert_not_called()
+        self.assertEqual(other.find("k2", BUNDLE, {"gzip"})[1], path)
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+
+    def test_incompressible_data_is_sent_as_is(self):
+        data = os.urandom(4096)
+        self.cache.find("r", data, {"gzip"})
+        self.cache.wait()
+        self.assertIsNone(self.cache.find("r", data, {"gzip"}))
+
+    def test_large_files_are_memory_mapped(self):
+        path = os.path.join(self.directory, "bundle.js")
+        with open(path, "wb") as f:
+            f.write(BUNDLE)
+        with mock.patch.object(_compress, "_MMAP_THRESHOLD", 1024), \
+                mock.patch("mmap.mmap", wraps=_compress.mmap.mmap) as mapped:
+            self.cache.find(path, path, {"gzip"})
+            self.cache.wait()
+            mapped.assert_called_once()
+        with open(self.cache.find(path, path, {"gzip"})[1], "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()), BUNDLE)
+
+    def test_stop_drops_queued_assets(self):
+        started, release = threading.Event(), threading.Event()
+        compressed = []
+
+        def slow(data):
+            compressed.append(data)
+            started.set()
+            release.wait(5)
+            return gzip.compress(data)
+
+        self.cache._codecs = {"gzip": ("gz", slow)}
+        for i in range(5):
+            self.cache.find(i, BUNDLE + bytes([i]), {"gzip"})
+        self.assertTrue(started.wait(5))
+        start = time.perf_counter()
+        self.cache.stop()
+        self.cache.wait()
+        self.assertLess(time.perf_counter() - start, 0.5)
+        release.set()
+        self.cache._thread.join(5)
+        self.assertFalse(self.cache._thread.is_alive())
+        self.assertEqual(len(compressed), 1)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_failed_write_leaves_no_temporary(self):
+        with mock.patch("os.replace", side_effect=OSError("disk full")), self.assertLogs(level="ERROR"):
+            self.cache.find("k", BUNDLE, {"gzip"})
+            self.cache.wait()
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_stale_temporaries_are_removed(self):
+        stale, fresh = os.path.join(self.directory, ".a.x"), os.path.join(self.directory, ".b.x")
+        for path in (stale, fresh):
+            open(path, "wb").close()
+        os.utime(stale, (0, 0))
+        other = _VariantCache(self.directory)
+        self.addCleanup(other.stop)
+        self.assertEqual(os.listdir(self.directory), [".b.x"])
+
+    def test_accepted_encodings(self):
+        self.assertEqual(accepted_encodings("gzip, deflate, br"), {"gzip", "deflate", "br"})
+        self.assertEqual(accepted_encodings("br;q=0, gzip;q=0.8"), {"gzip"})
+        self.assertEqual(accepted_encodings(None), set())
+
+
+class TestCompressedServing(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = os.path.join(tmp.name, "app")
+        os.mkdir(self.root)
+        with open(os.path.join(self.root, "bundle.js"), "wb") as f:
+            f.write(BUNDLE)
+        with open(os.path.join(self.root, "font.woff2"), "wb") as f:
+            f.write(b"\0" * 4096)
+        self.cache_dir = os.path.join(tmp.name, "cache")
+
+    def serve(self, source):
+        server = _AssetServer(source, compress=True, cache_dir=self.cache_dir)
+        server.start()
+        self.addCleanup(server.stop)
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        self.addCleanup(conn.close)
+        return server, conn
+
+    def get(self, conn, path, headers):
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        return response, response.read()
+
+    def check_gzip(self, server, conn, path):
+        gz = {"Accept-Encoding": "gzip"}
+        response, body = self.get(conn, path, gz)
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(response.getheader("Vary"), "Accept-Encoding")
+        self.assertEqual(body, BUNDLE)
+        server.variants.wait()
+        response, body = self.get(conn, path, gz)
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(int(response.getheader("Content-Length")), len(body))
+        self.assertLess(len(body), len(BUNDLE) / 4)
+        self.assertEqual(gzip.decompress(body), BUNDLE)
+        etag = response.getheader("ETag")
+        response, _ = self.get(conn, path, dict(gz, **{"If-None-Match": etag}))
+        self.assertEqual(response.status, 304)
+        # The gzip variant's tag does not validate the identity representation.
+        response, body = self.get(conn, path, {"If-None-Match": etag})
+        self.assertEqual(response.status, 200)
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(body, BUNDLE)
+
+    def test_directory(self):
+        server, conn = self.serve(self.root)
+        self.check_gzip(server, conn, "/bundle.js")
+        response, body = self.get(conn, "/font.woff2", {"Accept-Encoding": "gzip"})
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertIsNone(response.getheader("Vary"))
+
+    def test_memory(self):
+        assets = AssetRegistry()
+        assets.add("bundle.js", BUNDLE)
+        server, conn = self.serve(assets)
+        self.check_gzip(server, conn, "/bundle.js")
+        response, body = self.get(conn, assets.url("bundle.js"), {"Accept-Encoding": "gzip"})
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertIn("immutable", response.getheader("Cache-Control"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from webview._executor import _OffloadTracker
+
+
+class TestOffloadTracker(unittest.TestCase):
+    def test_counts_queued_running_and_completed(self):
+        tracker = _OffloadTracker()
+        started = threading.Event()
+        release = threading.Event()
+
+        def work():
+            started.set()
+            release.wait(5)
+            return 42
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            first = tracker.submit(executor, work)
+            started.wait(5)
+            second = tracker.submit(executor, lambda: 1)
+            stats = tracker.stats()
+            self.assertEqual((stats["queued"], stats["running"], stats["workers"]), (1, 1, 1))
+            self.assertEqual(stats["utilization"], 1.0)
+            release.set()
+            self.assertEqual(first.result(5), 42)
+            self.assertEqual(second.result(5), 1)
+
+        stats = tracker.stats()
+        self.assertEqual((stats["queued"], stats["running"], stats["completed"]), (0, 0, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import threading
+import unittest
+from fake_webview import FakeWebviewTestCase
+from webview._fake_backend import _CallRejected
+
+
+class TestFakeBackend(FakeWebviewTestCase):
+    def test_call_round_trip(self):
+        self.webview.bind("add", lambda a, b: a + b)
+        self.assertEqual(self.run_until([self.page.call("add", 1, 2)]), [3])
+
+    def test_call_rejected(self):
+        def fail():
+            raise ValueError("boom")
+
+        self.webview.bind("fail", fail)
+        future = self.page.call("fail")
+        with self.assertRaises(_CallRejected) as raised:
+            self.run_until([future])
+        self.assertEqual(raised.exception.value, "boom")
+
+    def test_binary_round_trip(self):
+        self.webview.bind("echo", lambda data: data)
+        self.assertEqual(self.run_until([self.page.call("echo", b"\x00\xff")]), [b"\x00\xff"])
+
+    def test_latency(self):
+        self.page.latency = 0.02
+        self.webview.bind("ping", lambda: "pong")
+        future = self.page.call("ping")
+        self.assertEqual(self.run_until([future]), ["pong"])
+
+    def test_batching(self):
+        calls = []
+        self.webview.bind("add", lambda a, b: calls.append((a, b)) or a + b)
+        self.webview.bind("fail", lambda: 1 / 0)
+        self.webview.enable_batching()
+        self.assertNotIn("add", self.page.bindings)
+        futures = self.page.call_batch([("add", [1, 2]), ("fail", []), ("add", [3, 4]), ("missing", [])])
+        with self.running():
+            self.assertEqual(futures[0].result(5), 3)
+            self.assertEqual(futures[2].result(5), 7)
+            with self.assertRaises(_CallRejected):
+                futures[1].result(5)
+            with self.assertRaises(_CallRejected) as raised:
+                futures[3].result(5)
+            self.assertEqual(raised.exception.value, "missing is not bound")
+        self.assertEqual(calls, [(1, 2), (3, 4)])
+
+    def test_dispatch_from_workers(self):
+        ui_thread = []
+        seen = []
+        done = threading.Event()
+
+        def update(worker, i):
+            ui_thread.append(threading.current_thread())
+            seen.append((worker, i))
+            if len(seen) == 400:
+                done.set()
+
+        def work(worker):
+            for i in range(100):
+                self.webview.dispatch(lambda i=i: update(worker, i))
+
+        with self.running() as thread:
+            workers = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            self.assertTrue(done.wait(5))
+        self.assertEqual(set(ui_thread), {thread})
+        for n in range(4):
+            self.assertEqual([i for worker, i in seen if worker == n], list(range(100)))
+
+    def test_dispatch_racing_destroy(self):
+        errors = []
+        entered = threading.Event()
+        proceed = threading.Event()
+        native_dispatch = self.lib.webview_dispatch
+
+        def slow_dispatch(handle, fn, arg):
+            # Holds a worker between reading the handle and using it.
+            entered.set()
+            proceed.wait(5)
+            native_dispatch(handle, fn, arg)
+
+        self.lib.webview_dispatch = slow_dispatch
+
+        def work():
+            try:
+                self.webview.dispatch(lambda: None)
+            except Exception as e:
+                errors.append(e)
+
+        worker = threading.Thread(target=work)
+        worker.start()
+        self.assertTrue(entered.wait(5))
+        destroyer = threading.Thread(target=self.webview.destroy)
+        destroyer.start()
+        # destroy() has to wait for the dispatch in progress.
+        destroyer.join(0.2)
+        self.assertTrue(destroyer.is_alive())
+        proceed.set()
+        worker.join(5)
+        destroyer.join(5)
+        self.assertIsNone(self.webview._handle)
+        self.assertEqual(errors, [])
+
+    def test_destroy_in_dispatched_closure_skips_the_rest(self):
+        ran = []
+        # Queued before the loop starts, so they run in one batch.
+        self.webview.dispatch(self.webview.destroy)
+        self.webview.dispatch(lambda: ran.append(1))
+        thread = threading.Thread(target=self.webview.run)
+        thread.start()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(ran, [])
+
+    def test_coalesced_returns_resolve(self):
+        self.webview.enable_return_coalescing(max_pending=8)
+        self.webview.bind("double", lambda x: x * 2)
+        futures = [self.page.call("double", i) for i in range(20)]
+        self.assertEqual(self.run_until(futures), [i * 2 for i in range(20)])
+        self.assertLess(self.page.eval_count, 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import threading
+import unittest
+from unittest import mock
+from fake_webview import FakeWebviewTestCase
+from webview import _js
+from webview._init_scripts import _InitScripts
+
+
+class TestInitScripts(unittest.TestCase):
+    def test_priority_then_insertion_order(self):
+        scripts = _InitScripts()
+        scripts.add("b", "b()", priority=10)
+        scripts.add("c", "c()")
+        scripts.add("a", "a()", priority=-5)
+        scripts.add("d", "d()")
+        self.assertEqual(scripts.names(), ["a", "c", "d", "b"])
+        self.assertEqual(scripts.take(), "a()\n;\nc()\n;\nd()\n;\nb()\n;")
+        self.assertIsNone(scripts.take())
+
+    def test_deduplicates_by_content(self):
+        scripts = _InitScripts()
+        self.assertTrue(scripts.add("one", "plugin()"))
+        self.assertFalse(scripts.add("two", "plugin()"))
+        self.assertFalse(scripts.add(None, "plugin()"))
+        self.assertEqual(scripts.take().count("plugin()"), 1)
+        self.assertFalse(scripts.add("three", "plugin()"))
+        self.assertIsNone(scripts.take())
+
+    def test_only_new_scripts_are_flushed(self):
+        scripts = _InitScripts()
+        scripts.add("a", "a()")
+        scripts.take()
+        scripts.add("b", "b()")
+        self.assertEqual(scripts.take(), "b()\n;")
+
+    def test_replace_and_remove_before_injection(self):
+        scripts = _InitScripts()
+        scripts.add("a", "old()")
+        scripts.add("a", "new()")
+        scripts.add("b", "b()")
+        scripts.remove("b")
+        with self.assertRaises(KeyError):
+            scripts.remove("b")
+        self.assertEqual(scripts.take(), "new()\n;")
+
+    def test_injected_scripts_are_fixed(self):
+        scripts = _InitScripts()
+        scripts.add("a", "a()")
+        scripts.take()
+        self.assertFalse(scripts.add("a", "a()"))
+        with self.assertRaises(RuntimeError):
+            scripts.add("a", "changed()")
+        with self.assertRaises(RuntimeError):
+            scripts.remove("a")
+        scripts.discard("a")
+        self.assertIn("a", scripts)
+
+    def test_minify_is_cached(self):
+        minifier = mock.Mock(side_effect=lambda source: source.replace(" ", ""))
+        scripts = _InitScripts()
+        scripts.add("a", "f( 1 )", minify=minifier)
+        scripts.add("b", "f( 1 )", minify=minifier)
+        minifier.assert_called_once_with("f( 1 )")
+        self.assertEqual(scripts.take(), "f(1)\n;")
+
+
+class TestWebviewInitScripts(FakeWebviewTestCase):
+    def test_injected_once_at_navigation(self):
+        self.webview.init("window.a = 1")
+        self.webview.init("window.a = 1")
+        self.webview.add_init_script("b", "window.b = 1", priority=-1)
+        self.assertEqual(self.page.scripts, [])
+        self.webview.navigate("https://example.com")
+        self.assertEqual(self.page.scripts, [b"window.b = 1\n;\nwindow.a = 1\n;"])
+        self.webview.navigate("https://example.org")
+        self.assertEqual(len(self.page.scripts), 1)
+        with self.assertRaises(RuntimeError):
+            self.webview.remove_init_script("b")
+
+    def test_bridge_scripts_run_first(self):
+        self.webview.add_init_script("app", "app()", priority=-100)
+        self.webview.bind("add", lambda a, b: a + b)
+        self.webview.enable_batching()
+        self.webview.set_html("<p>")
+        [script] = self.page.scripts
+        bridge = script.index(_js.BRIDGE_SCRIPT.encode())
+        batch = script.index(_js.BATCH_SCRIPT.encode())
+        define = script.index(b'window.__webview_batch__.define("add")')
+        self.assertLess(bridge, batch)
+        self.assertLess(batch, define)
+        self.assertLess(define, script.index(b"app()"))
+        self.assertEqual(self.webview.init_scripts()[-1], "app")
+
+    def test_unbound_batched_binding_is_not_injected(self):
+        self.webview.enable_batching()
+        self.webview.bind("gone", lambda: None)
+        self.webview.unbind("gone")
+        self.webview.navigate("about:blank")
+        self.assertNotIn(b'define("gone")', self.page.scripts[0])
+
+    def test_added_while_running_is_injected_right_away(self):
+        self.webview.init("first()")
+        injected = threading.Event()
+
+        def add_later():
+            self.webview.add_init_script("late", "late()")
+            self.webview.dispatch(injected.set)
+
+        with self.running():
+            threading.Thread(target=add_later).start()
+            self.assertTrue(injected.wait(5))
+        self.assertEqual(self.page.scripts, [b"first()\n;", b"late()\n;"])
+
+
+if __name__ == '__main__':
+    unittest.main()
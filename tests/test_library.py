@@ -1,14 +1,60 @@
+import os
+import subprocess
+import sys
+import threading
 import unittest
-from webview._webview_ffi import _webview_lib
+from webview._webview_ffi import _webview_lib, _LazyLibrary
 
 class TestLibrary(unittest.TestCase):
     def test_library_load(self):
         """Test that the library can be loaded successfully"""
         try:
-            lib = _webview_lib
-            self.assertIsNotNone(lib)
+            lib = _webview_lib.load()
         except Exception as e:
             self.fail(f"Failed to load library: {e}")
+        self.assertIsNotNone(lib)
+        self.assertTrue(_webview_lib.loaded)
+        self.assertTrue(callable(lib.webview_create))
+
+    def test_import_does_not_load_library(self):
+        src = os.path.join(os.path.dirname(__file__), "..", "src")
+        code = "import webview, webview._webview_ffi as ffi; print(ffi._webview_lib.loaded)"
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([src, os.environ.get("PYTHONPATH", "")]))
+        out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "False")
+
+class TestLazyLibrary(unittest.TestCase):
+    class Library:
+        def __init__(self):
+            self.webview_create = lambda debug, window: 1
+
+    def test_loads_once_on_first_use(self):
+        loads = []
+        lib = _LazyLibrary(lambda: loads.append(1) or self.Library())
+        self.assertFalse(lib.loaded)
+        threads = [threading.Thread(target=lambda: lib.webview_create(0, None)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(lib.loaded)
+        self.assertEqual(loads, [1])
+        self.assertIn("webview_create", vars(lib))
+
+    def test_failed_load_is_retried(self):
+        attempts = []
+
+        def factory():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("download failed")
+            return self.Library()
+
+        lib = _LazyLibrary(factory)
+        with self.assertRaises(RuntimeError):
+            lib.load()
+        self.assertFalse(lib.loaded)
+        self.assertEqual(lib.webview_create(0, None), 1)
 
 if __name__ == '__main__':
-    unittest.main() 
\ No newline at end of file
+    unittest.main() 
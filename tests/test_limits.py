@@ -0,0 +1,65 @@
+import unittest
+from webview._limits import _Limiter
+
+
+class TestLimiter(unittest.TestCase):
+    def setUp(self):
+        self.started = []
+        self.rejected = []
+
+    def submit(self, limiter, call):
+        limiter.submit(call, lambda: self.started.append(call), lambda error: self.rejected.append((call, error)))
+
+    def test_queues_beyond_max_concurrency(self):
+        limiter = _Limiter("query", max_concurrency=1)
+        for call in ("a", "b", "c"):
+            self.submit(limiter, call)
+        self.assertEqual(self.started, ["a"])
+        self.assertEqual(limiter.stats(), {"queued": 2, "running": 1, "rejected": 0, "dropped": 0})
+        limiter.release()
+        self.assertEqual(self.started, ["a", "b"])
+
+    def test_reject_policy(self):
+        limiter = _Limiter("query", max_concurrency=1, max_queue=1)
+        for call in ("a", "b", "c"):
+            self.submit(limiter, call)
+        self.assertEqual([call for call, _ in self.rejected], ["c"])
+        self.assertEqual(self.rejected[0][1]["code"], "overloaded")
+        self.assertEqual(limiter.stats()["rejected"], 1)
+
+    def test_drop_oldest_policy(self):
+        limiter = _Limiter("query", max_concurrency=1, max_queue=1, overflow="drop_oldest")
+        for call in ("a", "b", "c"):
+            self.submit(limiter, call)
+        self.assertEqual([call for call, _ in self.rejected], ["b"])
+        limiter.release()
+        self.assertEqual(self.started, ["a", "c"])
+        self.assertEqual(limiter.stats()["dropped"], 1)
+
+    def test_wait_policy_is_unbounded(self):
+        limiter = _Limiter("query", max_concurrency=1, overflow="wait")
+        for call in ("a", "b", "c"):
+            self.submit(limiter, call)
+        self.assertEqual(self.rejected, [])
+        self.assertEqual(limiter.stats()["queued"], 2)
+
+    def test_wait_policy_rejects_max_queue(self):
+        with self.assertRaises(ValueError):
+            _Limiter("query", max_concurrency=1, max_queue=1, overflow="wait")
+
+    def test_discard_cancelled_call(self):
+        limiter = _Limiter("query", max_concurrency=1)
+        self.submit(limiter, "a")
+        self.submit(limiter, "b")
+        limiter.discard("b")
+        limiter.release()
+        self.assertEqual(self.started, ["a"])
+        self.assertEqual(limiter.stats()["running"], 0)
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            _Limiter("query", 1, overflow="block")
+
+
+if __name__ == '__main__':
+    unittest.main()
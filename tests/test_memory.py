@@ -0,0 +1,70 @@
+import asyncio
+import gc
+import unittest
+import warnings
+from fake_webview import FakeWebviewTestCase
+from webview.webview import Webview
+
+
+class TestMemoryReport(FakeWebviewTestCase):
+    def test_counts_trampolines_and_undestroyed(self):
+        webview = self.webview
+        before = webview.memory_report()
+        webview.bind("add", lambda a, b: a + b)
+        report = webview.memory_report()
+        self.assertEqual(report["bindings"], 1)
+        # The binding plus the bridge's own cancel callback.
+        self.assertEqual(report["trampolines"], before["trampolines"] + 2)
+        self.assertGreaterEqual(report["undestroyed_webviews"], 1)
+        webview.destroy()
+        self.assertEqual(webview.memory_report()["undestroyed_webviews"], report["undestroyed_webviews"] - 1)
+
+    def test_inflight_payload_bytes(self):
+        webview, page = self.webview, self.page
+        started = asyncio.Event()
+        release = asyncio.Event()
+        reports = []
+
+        async def hold(data):
+            started.set()
+            await release.wait()
+            return len(data)
+
+        webview.bind("hold", hold)
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            future = asyncio.wrap_future(page.call("hold", "x" * 1000), loop=loop)
+            await started.wait()
+            reports.append(webview.memory_report())
+            release.set()
+            result = await future
+            reports.append(webview.memory_report())
+            return result
+
+        self.assertEqual(webview.run_async(main()), 1000)
+        self.assertEqual(reports[0]["pending_requests"], 1)
+        self.assertGreaterEqual(reports[0]["inflight_bytes"], 1000)
+        self.assertEqual((reports[1]["pending_requests"], reports[1]["inflight_bytes"]), (0, 0))
+
+    def test_warns_when_collected_without_destroy(self):
+        webview = Webview()
+        webview.bind("add", lambda a, b: a + b)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            del webview
+            gc.collect()
+        self.assertTrue(any(issubclass(w.category, ResourceWarning) for w in caught))
+
+    def test_no_warning_after_destroy(self):
+        webview = Webview()
+        webview.destroy()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            del webview
+            gc.collect()
+        self.assertEqual([w for w in caught if issubclass(w.category, ResourceWarning)], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
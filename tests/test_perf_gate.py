@@ -0,0 +1,27 @@
+import os
+import unittest
+
+
+@unittest.skipUnless(os.getenv("WEBVIEW_PERF_GATE"), "set WEBVIEW_PERF_GATE=1 to run the performance regression gate")
+class TestPerfGate(unittest.TestCase):
+    """Bridge micro-benchmarks on the fake backend against benchmarks/baseline.json."""
+
+    @classmethod
+    def setUpClass(cls):
+        import bench_bridge
+        cls.bench = bench_bridge
+        cls.results = bench_bridge.run_all()
+        cls.baseline = bench_bridge.load_baseline()
+
+    def test_no_regressions(self):
+        for name, value, base, limit, ok in self.bench.compare(self.results, self.baseline):
+            with self.subTest(metric=name):
+                self.assertTrue(ok, f"{name} regressed: {value:.3f} (normalized to the baseline machine) "
+                                    f"vs baseline {base:.3f}, limit {limit:.3f}")
+
+    def test_baseline_covers_every_metric(self):
+        self.assertEqual(set(self.baseline["metrics"]), set(self.bench.METRICS))
+
+
+if __name__ == '__main__':
+    unittest.main()
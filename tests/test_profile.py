@@ -0,0 +1,143 @@
+import asyncio
+import os
+import pstats
+import tempfile
+import unittest
+from fake_webview import FakeWebviewTestCase
+from webview import _profile
+from webview._profile import _Profiler, collapse
+
+
+def leaf(n):
+    return sum(range(n))
+
+
+def work(n):
+    return leaf(n) + leaf(n)
+
+
+class TestProfiler(unittest.TestCase):
+    def test_call_aggregates_across_calls(self):
+        profiler = _Profiler()
+        for _ in range(3):
+            self.assertEqual(profiler.call(work, (1000,)), 2 * sum(range(1000)))
+        stats = profiler.stats().stats
+        entry = next(value for func, value in stats.items() if func[2] == "work")
+        self.assertEqual((profiler.calls, entry[1]), (3, 3))
+
+    def test_call_async_profiles_steps(self):
+        async def fetch():
+            leaf(1000)
+            await asyncio.sleep(0)
+            return work(1000)
+
+        profiler = _Profiler()
+        self.assertEqual(asyncio.run(profiler.call_async(fetch())), 2 * sum(range(1000)))
+        names = {func[2] for func in profiler.stats().stats}
+        self.assertTrue({"leaf", "work"} <= names)
+        self.assertEqual(profiler.calls, 1)
+
+    def test_call_async_propagates_errors(self):
+        async def fail():
+            await asyncio.sleep(0)
+            raise KeyError("x")
+
+        with self.assertRaises(KeyError):
+            asyncio.run(_Profiler().call_async(fail()))
+
+    def test_busy_profiler_skips(self):
+        profiler = _Profiler()
+        with _profile._active:
+            self.assertEqual(profiler.call(work, (10,)), 2 * sum(range(10)))
+        self.assertEqual((profiler.calls, profiler.skipped), (0, 1))
+
+    def test_stats_do_not_wait_for_a_running_call(self):
+        profiler = _Profiler()
+        profiler.call(work, (10,))
+        before = profiler.stats()
+        self.assertFalse(profiler.stale)
+        with _profile._active:
+            self.assertIs(profiler.stats(), before)
+            self.assertTrue(profiler.stale)
+        self.assertIsNot(profiler.stats(), before)
+        self.assertFalse(profiler.stale)
+
+    def test_collapse(self):
+        profiler = _Profiler()
+        profiler.call(work, (200000,))
+        stacks = collapse(profiler.stats().stats)
+        leaf_stacks = [stack for stack in stacks if stack.split(";")[-1].startswith("leaf ")]
+        self.assertTrue(leaf_stacks)
+        self.assertTrue(all(stack.split(";")[-2].startswith("work ") for stack in leaf_stacks))
+
+
+class TestWebviewProfiling(FakeWebviewTestCase):
+    def test_bind_with_profile(self):
+        self.webview.bind("work", work, profile=True)
+        self.webview.bind("other", leaf)
+        futures = [self.page.call("work", 1000), self.page.call("other", 10), self.page.call("work", 10)]
+        with self.running():
+            for future in futures:
+                future.result(5)
+            self.check_profile()
+
+    def check_profile(self):
+        report = self.webview.profile_stats("work")
+        self.assertEqual(report["calls"], 2)
+        with tempfile.TemporaryDirectory() as tmp:
+            stats_path = os.path.join(tmp, "work.prof")
+            collapsed_path = os.path.join(tmp, "work.folded")
+            self.webview.dump_profile("work", stats_path)
+            self.webview.dump_profile("work", collapsed_path, format="collapsed", reset=True)
+            names = {func[2] for func in pstats.Stats(stats_path).stats}
+            with open(collapsed_path) as f:
+                lines = f.read().splitlines()
+        self.assertIn("work", names)
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+        self.assertEqual(self.webview.profile_stats("work")["calls"], 0)
+        with self.assertRaises(ValueError):
+            self.webview.profile_stats("other")
+
+    def test_runtime_toggle(self):
+        self.webview.bind("work", work)
+        self.webview.set_profiling("work")
+        future = self.page.call("work", 10)
+        with self.running():
+            future.result(5)
+            self.webview.set_profiling("work", False)
+            self.assertEqual(self.webview.profile_stats("work")["calls"], 1)
+
+    def test_stats_from_inside_a_profiled_call(self):
+        reports = []
+
+        def inspect():
+            reports.append(self.webview.profile_stats("inspect"))
+            with tempfile.TemporaryDirectory() as tmp:
+                self.webview.dump_profile("inspect", os.path.join(tmp, "inspect.prof"))
+            return work(10)
+
+        self.webview.bind("inspect", inspect, profile=True)
+        futures = [self.page.call("inspect"), self.page.call("inspect")]
+        with self.running():
+            for future in futures:
+                future.result(5)
+            report = self.webview.profile_stats("inspect")
+        self.assertEqual([report["stale"] for report in reports], [True, True])
+        self.assertEqual(reports[1]["calls"], 1)
+        self.assertEqual((report["calls"], report["stale"]), (2, False))
+
+    def test_generators_not_supported(self):
+        def numbers():
+            yield 1
+
+        with self.assertRaises(ValueError):
+            self.webview.bind("numbers", numbers, profile=True)
+
+    def test_unknown_format(self):
+        self.webview.bind("work", work, profile=True)
+        with self.assertRaises(ValueError):
+            self.webview.dump_profile("work", os.devnull, format="svg")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import asyncio
+import unittest
+from webview._replies import _ReplyCoalescer
+
+
+class TestReplyCoalescer(unittest.TestCase):
+    def setUp(self):
+        self.returns = []
+        self.evals = []
+        self.coalescer = _ReplyCoalescer(
+            lambda *reply: self.returns.append(reply), self.evals.append, max_pending=3)
+
+    def test_without_loop_flushes_immediately(self):
+        self.coalescer.add(b"1", 0, b"42")
+        self.assertEqual(self.returns, [(b"1", 0, b"42")])
+        self.assertEqual(self.evals, [])
+
+    def test_without_loop_uses_schedule(self):
+        scheduled = []
+        coalescer = _ReplyCoalescer(lambda *reply: self.returns.append(reply), self.evals.append,
+                                    max_pending=3, schedule=scheduled.append)
+        coalescer.add(b"1", 0, b"1")
+        coalescer.add(b"2", 0, b"2")
+        self.assertEqual(len(scheduled), 1)
+        scheduled[0]()
+        self.assertEqual(len(self.evals), 1)
+        self.assertEqual(len(coalescer), 0)
+
+    def test_flushes_once_per_loop_iteration(self):
+        async def burst():
+            self.coalescer.add(b"1", 0, b"1")
+            self.coalescer.add(b"2", 1, b'"boom"')
+            self.assertEqual(len(self.coalescer), 2)
+            await asyncio.sleep(0)
+
+        asyncio.run(burst())
+        self.assertEqual(self.returns, [])
+        self.assertEqual(len(self.evals), 1)
+        self.assertIn(b'["1",0,"1"],["2",1,"\\"boom\\""]', self.evals[0])
+
+    def test_threshold_forces_flush(self):
+        async def burst():
+            for seq in (b"1", b"2", b"3"):
+                self.coalescer.add(seq, 0, b"null")
+            self.assertEqual(len(self.coalescer), 0)
+
+        asyncio.run(burst())
+        self.assertEqual(len(self.evals), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import http.client
+import os
+import tempfile
+import unittest
+from unittest import mock
+from fake_webview import FakeWebviewTestCase
+from webview._server import _AssetServer
+
+
+class TestAssetServer(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.write("index.html", b"<!doctype html><script type=module src=app.mjs></script>")
+        self.write("app.mjs", b"export default 1;")
+        self.write("main.js", b"console.log(1);")
+        self.write("module.wasm", b"\0asm\1\0\0\0")
+        self.write("style.css", b"body{}")
+        self.write("data.json", b"{}")
+        self.write("docs/index.html", b"docs")
+        self.server = self.start()
+
+    def write(self, name, data):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def start(self, **kwargs):
+        server = _AssetServer(self.root, **kwargs)
+        server.start()
+        self.addCleanup(server.stop)
+        return server
+
+    def connect(self, server=None):
+        conn = http.client.HTTPConnection("127.0.0.1", (server or self.server).server_address[1], timeout=5)
+        self.addCleanup(conn.close)
+        return conn
+
+    def get(self, conn, path, headers=None):
+        conn.request("GET", path, headers=headers or {})
+        response = conn.getresponse()
+        return response, response.read()
+
+    def test_serves_files_with_mime_types(self):
+        conn = self.connect()
+        for path, content_type in [("/app.mjs", "text/javascript"), ("/main.js", "text/javascript"),
+                                   ("/module.wasm", "application/wasm"), ("/style.css", "text/css"),
+                                   ("/data.json", "application/json"), ("/index.html", "text/html")]:
+            response, body = self.get(conn, path)
+            self.assertEqual(response.status, 200, path)
+            self.assertTrue(response.getheader("Content-Type").startswith(content_type), path)
+            self.assertEqual(int(response.getheader("Content-Length")), len(body))
+        self.assertEqual(self.get(conn, "/app.mjs")[1], b"export default 1;")
+
+    def test_keep_alive_reuses_connection(self):
+        conn = self.connect()
+        self.get(conn, "/main.js")
+        sock = conn.sock
+        self.assertIsNotNone(sock)
+        self.get(conn, "/style.css")
+        self.assertIs(conn.sock, sock)
+
+    def test_etag_revalidation(self):
+        conn = self.connect()
+        response, _ = self.get(conn, "/main.js")
+        etag = response.getheader("ETag")
+        self.assertEqual(response.getheader("Cache-Control"), "no-cache")
+        response, body = self.get(conn, "/main.js", {"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+        response, _ = self.get(conn, "/main.js", {"If-None-Match": '"other"'})
+        self.assertEqual(response.status, 200)
+
+    def test_etag_changes_with_file(self):
+        conn = self.connect()
+        etag = self.get(conn, "/main.js")[0].getheader("ETag")
+        self.write("main.js", b"console.log(2); // changed")
+        response, body = self.get(conn, "/main.js", {"If-None-Match": etag})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"console.log(2); // changed")
+
+    def test_last_modified_revalidation(self):
+        conn = self.connect()
+        last_modified = self.get(conn, "/style.css")[0].getheader("Last-Modified")
+        response, _ = self.get(conn, "/style.css", {"If-Modified-Since": last_modified})
+        self.assertEqual(response.status, 304)
+
+    def test_directory_index_and_redirect(self):
+        conn = self.connect()
+        response, body = self.get(conn, "/")
+        self.assertEqual(response.status, 200)
+        self.assertIn(b"app.mjs", body)
+        response, _ = self.get(conn, "/docs?x=1")
+        self.assertEqual(response.status, 301)
+        self.assertEqual(response.getheader("Location"), "/docs/?x=1")
+        self.assertEqual(self.get(conn, "/docs/")[1], b"docs")
+
+    def test_missing_file_and_traversal(self):
+        conn = self.connect()
+        self.assertEqual(self.get(conn, "/missing.js")[0].status, 404)
+        self.assertEqual(self.get(conn, "/route")[0].status, 404)
+        response, body = self.get(conn, "/../" + os.path.basename(self.root) + "/../etc/passwd")
+        self.assertEqual(response.status, 404)
+
+    def test_spa_fallback(self):
+        server = self.start(spa=True)
+        conn = self.connect(server)
+        response, body = self.get(conn, "/settings/profile")
+        self.assertEqual(response.status, 200)
+        self.assertIn(b"app.mjs", body)
+        # Missing assets are still missing.
+        self.assertEqual(self.get(conn, "/missing.js")[0].status, 404)
+
+    def test_rejects_foreign_host(self):
+        conn = self.connect()
+        response, _ = self.get(conn, "/index.html", {"Host": "attacker.example:80"})
+        self.assertEqual(response.status, 403)
+        response, _ = self.get(conn, "/index.html", {"Host": f"localhost:{self.server.server_address[1]}"})
+        self.assertEqual(response.status, 200)
+
+    def test_missing_directory(self):
+        with self.assertRaises(FileNotFoundError):
+            _AssetServer(os.path.join(self.root, "nope"))
+
+
+class TestServeDirectory(FakeWebviewTestCase):
+    def test_navigates_and_stops_on_destroy(self):
+        webview = self.webview
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache, \
+                mock.patch.dict(os.environ, WEBVIEW_ASSET_CACHE=cache):
+            with open(os.path.join(root, "index.html"), "wb") as f:
+                f.write(b"hello")
+            url = webview.serve_directory(root)
+            self.assertEqual(self.page.url, url)
+            self.assertTrue(url.startswith("http://127.0.0.1:"))
+            server = webview._servers[0]
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+            conn.request("GET", "/")
+            self.assertEqual(conn.getresponse().read(), b"hello")
+            conn.close()
+            webview.destroy()
+            self.assertEqual(webview._servers, [])
+            self.assertEqual(server.socket.fileno(), -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
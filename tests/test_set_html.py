@@ -0,0 +1,25 @@
+import base64
+import unittest
+from fake_webview import FakeWebviewTestCase
+
+HTML = "<!doctype html><h1>Grüße, 世界</h1>" + "<p class=\"row\">&nbsp;</p>" * 100
+
+
+class TestSetHtml(FakeWebviewTestCase):
+    def test_uses_native_set_html(self):
+        self.webview.set_html(HTML)
+        self.assertEqual(self.page.html, HTML)
+        self.assertEqual(self.page.url, "about:blank")
+
+    def test_falls_back_to_base64_data_url(self):
+        self.lib.webview_set_html = None
+        self.webview.set_html(HTML)
+        url = self.page.url
+        prefix = "data:text/html;charset=utf-8;base64,"
+        self.assertTrue(url.startswith(prefix))
+        self.assertEqual(base64.b64decode(url[len(prefix):]).decode("utf-8"), HTML)
+        self.assertLess(len(url), len(HTML.encode("utf-8")) * 4 / 3 + len(prefix) + 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
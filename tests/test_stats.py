@@ -0,0 +1,41 @@
+import unittest
+from webview._stats import _Histogram, _BindingStats, _bucket, _bucket_bounds
+
+
+class TestHistogram(unittest.TestCase):
+    def test_buckets_are_contiguous(self):
+        previous_high = 0
+        for index in range(200):
+            low, high = _bucket_bounds(index)
+            self.assertEqual(low, previous_high)
+            self.assertEqual(_bucket(low), index)
+            self.assertEqual(_bucket(high - 1), index)
+            previous_high = high
+
+    def test_percentiles_within_bucket_error(self):
+        histogram = _Histogram()
+        for ns in range(1, 10001):
+            histogram.record(ns * 1000)
+        for q, expected in ((50, 5_000_000), (95, 9_500_000), (99, 9_900_000)):
+            self.assertAlmostEqual(histogram.percentile(q) / expected, 1, delta=0.125)
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 10000)
+        self.assertAlmostEqual(summary["max_ms"], 10.0)
+
+    def test_empty(self):
+        self.assertIsNone(_Histogram().percentile(50))
+        self.assertIsNone(_Histogram().summary()["p99_ms"])
+
+    def test_binding_stats_error_rate_and_reset(self):
+        stats = _BindingStats()
+        stats.record_callback(1000, True)
+        stats.record_callback(2000, False)
+        summary = stats.summary()
+        self.assertEqual((summary["calls"], summary["errors"], summary["error_rate"]), (2, 1, 0.5))
+        self.assertEqual(summary["callback"]["count"], 2)
+        stats.reset()
+        self.assertEqual(stats.summary()["calls"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import asyncio
+import unittest
+from webview._streams import _Stream
+
+
+class TestStream(unittest.TestCase):
+    def pull_all(self, stream):
+        replies = []
+        while not replies or (replies[-1][0] and not replies[-1][1][0]):
+            stream.pull(lambda success, result: replies.append((success, result)))
+        return replies
+
+    def test_generator_is_pulled_chunk_by_chunk(self):
+        produced = []
+
+        def rows():
+            for i in range(2):
+                produced.append(i)
+                yield i
+
+        stream = _Stream(1, None, rows())
+        self.assertEqual(produced, [])
+        stream.pull(lambda success, result: None)
+        self.assertEqual(produced, [0])
+        stream.close()
+
+    def test_generator_reports_end_and_errors(self):
+        def failing():
+            yield "a"
+            raise ValueError("boom")
+
+        replies = self.pull_all(_Stream(1, None, failing()))
+        self.assertEqual(replies[0], (True, [False, "a"]))
+        self.assertFalse(replies[1][0])
+        self.assertIsInstance(replies[1][1], ValueError)
+
+    def test_async_generator(self):
+        async def rows():
+            for i in range(2):
+                await asyncio.sleep(0)
+                yield i
+
+        async def consume():
+            stream = _Stream(1, None, rows())
+            chunks = []
+            while True:
+                future = asyncio.get_running_loop().create_future()
+                stream.pull(lambda success, result: future.set_result(result))
+                finished, chunk = await future
+                if finished:
+                    return chunks
+                chunks.append(chunk)
+
+        self.assertEqual(asyncio.run(consume()), [0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import gzip
+import json
+import unittest
+from fake_webview import FakeWebviewTestCase
+from webview._telemetry import _TelemetryBuffer
+
+
+class TestTelemetryBuffer(unittest.TestCase):
+    def test_compressed_and_plain_batches(self):
+        buffer = _TelemetryBuffer()
+        buffer.add_batch(gzip.compress(json.dumps([{"type": "paint", "name": "first-paint", "ts": 1}]).encode()))
+        buffer.add_batch(json.dumps([{"type": "longtask", "ts": 2, "duration": 80}]))
+        self.assertEqual([r["type"] for r in buffer.records()], ["paint", "longtask"])
+        self.assertEqual(buffer.records("longtask")[0]["duration"], 80)
+        self.assertEqual(buffer.stats()["batches"], 2)
+
+    def test_ring_buffer_drops_oldest(self):
+        buffer = _TelemetryBuffer(capacity=3)
+        buffer.add_batch(json.dumps([{"type": "memory", "ts": ts} for ts in range(5)]))
+        self.assertEqual([r["ts"] for r in buffer.records()], [2, 3, 4])
+        self.assertEqual((buffer.stats()["received"], buffer.stats()["dropped"]), (5, 2))
+
+    def test_clear(self):
+        buffer = _TelemetryBuffer()
+        buffer.add_batch("[{\"type\": \"paint\", \"ts\": 1}]")
+        self.assertEqual(len(buffer.records(clear=True)), 1)
+        self.assertEqual(buffer.records(), [])
+
+    def test_rejects_non_list(self):
+        with self.assertRaises(ValueError):
+            _TelemetryBuffer().add_batch("{}")
+
+
+class TestWebviewTelemetry(FakeWebviewTestCase):
+    def test_receives_batches(self):
+        self.webview.enable_telemetry(interval_ms=1000, capacity=100)
+        self.webview.navigate("about:blank")
+        self.assertTrue(any(b"(1000);" in script for script in self.page.scripts))
+        records = [{"type": "navigation", "ts": 1, "load": 120.5}, {"type": "paint", "name": "first-paint", "ts": 2}]
+        futures = [self.page.call("__webview_telemetry__", gzip.compress(json.dumps(records).encode())),
+                   self.page.call("__webview_telemetry__", "not json")]
+        self.assertEqual(self.run_until(futures), [None, None])
+        self.assertEqual(self.webview.telemetry(), records)
+        self.assertEqual(self.webview.telemetry("paint"), records[1:])
+        self.assertEqual(self.webview.stats()["telemetry"]["batches"], 1)
+
+    def test_disabled_by_default(self):
+        self.assertEqual(self.webview.telemetry(), [])
+        self.assertIsNone(self.webview.stats()["telemetry"])
+
+
+if __name__ == '__main__':
+    unittest.main()
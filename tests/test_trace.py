@@ -0,0 +1,85 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from fake_webview import FakeWebviewTestCase
+from webview._stats import now_ns
+from webview._trace import _Tracer
+
+
+class TestTracer(unittest.TestCase):
+    def test_complete_and_async_spans(self):
+        tracer = _Tracer()
+        start = now_ns()
+        tracer.complete("add", "bind", start, start + 2000, {"seq": "1"})
+        tracer.async_span("fetch", "bind.async", "2", start, start + 5000)
+        events = tracer.to_dict()["traceEvents"]
+        span = next(e for e in events if e["ph"] == "X")
+        self.assertEqual((span["name"], span["dur"], span["args"]), ("add", 2.0, {"seq": "1"}))
+        self.assertEqual(span["tid"], threading.get_native_id())
+        begin, end = [e for e in events if e["ph"] in "be"]
+        self.assertEqual((begin["id"], end["ts"] - begin["ts"]), ("2", 5.0))
+        names = {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+        self.assertEqual(names[span["tid"]], threading.current_thread().name)
+
+    def test_page_entries_share_the_clock(self):
+        tracer = _Tracer()
+        before = now_ns() / 1000
+        tracer.add_page_entries([["ready", "mark", time.time() * 1000, 0], ["render", "measure", time.time() * 1000, 4]])
+        after = now_ns() / 1000
+        mark, measure = list(tracer._events)
+        self.assertEqual((mark["ph"], mark["tid"]), ("i", 0))
+        self.assertEqual((measure["ph"], measure["dur"]), ("X", 4000))
+        # Wall clock and perf counter agree to well within a millisecond here.
+        self.assertLess(abs(mark["ts"] - (before + after) / 2), 5000)
+
+    def test_bounded(self):
+        tracer = _Tracer(max_events=3)
+        for _ in range(10):
+            tracer.instant("tick", "test")
+        self.assertEqual(len(tracer), 3)
+
+
+class TestWebviewTracing(FakeWebviewTestCase):
+    def test_records_bridge_activity(self):
+        async def slow(x):
+            await asyncio.sleep(0.01)
+            return x
+
+        self.webview.start_tracing()
+        self.webview.bind("add", lambda a, b: a + b)
+        self.webview.bind("slow", slow)
+        self.assertIn("__webview_trace__", self.page.bindings)
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            futures = [self.page.call("add", 1, 2), self.page.call("slow", 3),
+                       self.page.call("__webview_trace__", [["frame", "measure", time.time() * 1000, 2.5]])]
+            results = [await asyncio.wrap_future(f, loop=loop) for f in futures]
+            self.webview.eval("1")
+            return results
+
+        self.assertEqual(self.webview.run_async(main()), [3, 3, None])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            trace = self.webview.stop_tracing(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)["traceEvents"], trace["traceEvents"])
+        events = trace["traceEvents"]
+        kinds = {(e["cat"], e["name"], e["ph"]) for e in events if e["ph"] != "M"}
+        for expected in [("bind", "add", "X"), ("bind", "slow", "X"), ("bind.async", "slow", "b"),
+                         ("bind.async", "slow", "e"), ("return", "return", "X"), ("eval", "eval", "X"),
+                         ("webview", "run", "X"), ("webview", "destroy", "X"), ("page", "frame", "X")]:
+            self.assertIn(expected, kinds)
+        self.assertNotIn(("bind.async", "add", "b"), kinds)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(self.webview.stop_tracing())
+        self.assertNotIn("__webview_trace__", self.page.bindings)
+
+
+if __name__ == '__main__':
+    unittest.main()
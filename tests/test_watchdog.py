@@ -0,0 +1,70 @@
+import time
+import unittest
+from fake_webview import FakeWebviewTestCase
+from webview._watchdog import _StallWatchdog
+
+
+def stuck_in_here(seconds):
+    time.sleep(seconds)
+
+
+class TestStallWatchdog(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.watchdog = _StallWatchdog(budget_ms=5, severe_ms=30, on_stall=self.events.append)
+        self.addCleanup(self.watchdog.stop)
+
+    def timed(self, name, seconds):
+        call = self.watchdog.begin(name)
+        stuck_in_here(seconds)
+        self.watchdog.end(call)
+
+    def test_within_budget(self):
+        self.timed("fast", 0)
+        self.assertEqual((self.watchdog.stalls, self.events), (0, []))
+
+    def test_over_budget(self):
+        with self.assertLogs(level="WARNING"):
+            self.timed("slow", 0.01)
+        self.assertEqual(len(self.events), 1)
+        event = self.events[0]
+        self.assertEqual((event["binding"], event["severe"], event["stack"]), ("slow", False, None))
+        self.assertGreaterEqual(event["duration_ms"], 10)
+
+    def test_severe_stall_captures_stack(self):
+        with self.assertLogs(level="WARNING") as logs:
+            self.timed("stuck", 0.1)
+        event = self.events[0]
+        self.assertTrue(event["severe"])
+        self.assertIn("stuck_in_here", "".join(event["stack"]))
+        self.assertIn("stuck_in_here", logs.output[0])
+        summary = self.watchdog.summary()
+        self.assertEqual((summary["stalls"], summary["severe"], summary["by_binding"]), (1, 1, {"stuck": 1}))
+
+    def test_nested_calls_timed_once(self):
+        outer = self.watchdog.begin("outer")
+        self.assertIsNone(self.watchdog.begin("inner"))
+        self.watchdog.end(None)
+        self.watchdog.end(outer)
+        self.assertEqual(self.watchdog.stalls, 0)
+
+
+class TestWebviewStallDetection(FakeWebviewTestCase):
+    def test_slow_binding_reported_in_stats(self):
+        stalls = []
+        self.webview.enable_stall_detection(budget_ms=5, severe_ms=1000, on_stall=stalls.append)
+        self.webview.bind("slow", lambda: stuck_in_here(0.02))
+        self.webview.bind("fast", lambda: None)
+        futures = [self.page.call("slow"), self.page.call("fast")]
+        with self.assertLogs(level="WARNING"):
+            self.run_until(futures)
+        self.assertEqual([stall["binding"] for stall in stalls], ["slow"])
+        summary = self.webview.stats()["stalls"]
+        self.assertEqual((summary["stalls"], summary["by_binding"]), (1, {"slow": 1}))
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(self.webview.stats()["stalls"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,12 @@
 import os
 import platform
+import threading
 import unittest
+from fake_webview import FakeWebviewTestCase
+from webview._fake_backend import _CallRejected
 from webview.webview import Webview, Size, SizeHint
 
+
 @unittest.skipIf(
     platform.system() == "Darwin" and bool(os.getenv("CI")),
     "Skipping test on macOS CI"
@@ -24,5 +28,32 @@ class TestWebview(unittest.TestCase):
         webview.title = title
         self.assertEqual(webview.title, title)
 
+
+class TestWebviewBridge(FakeWebviewTestCase):
+    def test_bind_after_enable_batching(self):
+        self.webview.bind("before", lambda: 1)
+        self.webview.enable_batching()
+        self.webview.bind("after", lambda: 2)
+        self.webview.bind("removed", lambda: 3)
+        self.webview.unbind("removed")
+        futures = self.page.call_batch([("before", []), ("after", []), ("removed", [])])
+        with self.running():
+            self.assertEqual([futures[0].result(5), futures[1].result(5)], [1, 2])
+            with self.assertRaises(_CallRejected) as raised:
+                futures[2].result(5)
+        self.assertEqual(raised.exception.value, "removed is not bound")
+
+    def test_executor_requires_plain_callback(self):
+        async def fetch():
+            return 1
+
+        with self.assertRaises(ValueError):
+            self.webview.bind("fetch", fetch, executor=True)
+        self.webview.bind("compute", threading.get_ident, executor=True)
+        self.webview.bind("ui", threading.get_ident)
+        worker, ui = self.run_until([self.page.call("compute"), self.page.call("ui")])
+        self.assertNotEqual(worker, ui)
+
+
 if __name__ == '__main__':
     unittest.main()